@@ -2,6 +2,7 @@
 from rest_framework import serializers
 from apps.products.models import Product, ProductImage
 from apps.carts.models import CartItem, Cart
+from apps.carts.services import load_cart
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
@@ -18,13 +19,19 @@ class ProductImageSerializer(serializers.ModelSerializer):
 
 class MiniProductSerializer(serializers.ModelSerializer):
     effective_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
-    images = ProductImageSerializer(many=True, read_only=False)
+    images = serializers.SerializerMethodField()
 
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'description', 'original_price', 'effective_price', 'is_on_sale', 'stock', 'images']
 
+    def get_images(self, obj):
+        # carts only show the primary image, joined in by cart_items_queryset()
+        if not obj.primary_image_id:
+            return []
+        return ProductImageSerializer([obj.primary_image], many=True).data
+
 
 
 class CartItemSerializer(serializers.ModelSerializer):
@@ -52,15 +59,18 @@ class CartItemSerializer(serializers.ModelSerializer):
 # cart/serializers.py
 class CartSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
-    items = CartItemSerializer(many=True, read_only=True)
+    items = CartItemSerializer(many=True, read_only=True, source='lines')
+    total_items = serializers.IntegerField(read_only=True)
     total_quantity = serializers.IntegerField(read_only=True)
-    cart_total = serializers.SerializerMethodField()
+    cart_total = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True, source='subtotal', coerce_to_string=False)
 
     class Meta:
         model = Cart
-        fields = ['id', 'items', 'total_quantity', 'cart_total', 'created_at']
+        fields = ['id', 'items', 'total_items', 'total_quantity', 'cart_total', 'created_at']
 
-    def get_cart_total(self, obj: Cart):
-        # We need to sum up the effective prices of all items
-        total = sum(item.product.effective_price * item.quantity for item in obj.items.all())
-        return total
\ No newline at end of file
+    def to_representation(self, obj: Cart):
+        # Items, products and images are loaded once and the totals are
+        # computed from the same lines (see carts/services.py)
+        if not hasattr(obj, 'lines'):
+            load_cart(obj)
+        return super().to_representation(obj)
@@ -5,45 +5,37 @@ from rest_framework import viewsets, status, generics
 
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from apps.carts.models import Cart, CartItem
 from apps.carts.api import CartItemSerializer, CartSerializer
-import uuid
+from apps.carts.services import (
+    anonymous_cart_key,
+    cart_items_queryset,
+    empty_cart,
+    get_cart,
+    get_summary,
+    load_cart,
+    merge_anonymous_cart,
+    set_cart_cookie,
+    CART_COOKIE,
+)
+from django.db.models import Prefetch
+from django.http import Http404
 
 class UserCartViewSet(generics.ListCreateAPIView):
-    queryset = Cart.objects.all()
+    queryset = Cart.objects.prefetch_related(
+        Prefetch('items', queryset=cart_items_queryset(), to_attr='lines')
+    )
     serializer_class = CartSerializer
     authentication_classes = []
     
 # --- Helper Function ---
-def get_or_create_cart(request):
-    """Retrieves the cart based on authenticated user or session key."""
-    cart = None
-    
-    # 1. Try to get the cart for an authenticated user
-    if request.user.is_authenticated:
-        # Get or create a cart linked to the user
-        cart, created = Cart.objects.get_or_create(
-            user=request.user, 
-            defaults={'session_key': None} # Ensure session_key is cleared if user logs in
-        )
-    
-    # 2. Try to get the cart using the session key (for anonymous users)
-    else:
-        # We expect the front end (Next.js) to send the cart_id in a cookie
-        cart_id = request.COOKIES.get('cart_id')
-        if cart_id:
-            try:
-                cart = Cart.objects.get(session_key=cart_id, user__isnull=True)
-            except Cart.DoesNotExist:
-                # Cart ID is invalid/expired, create a new one
-                pass
-
-        if not cart:
-            # Create a brand new anonymous cart
-            cart = Cart.objects.create(session_key=uuid.uuid4())
-            # Note: The view will set this session_key as a cookie in the response
-
+def get_cart_or_404(request):
+    """The caller's saved cart; 404 when they have not added anything yet."""
+    cart = get_cart(request)
+    if cart is None:
+        raise Http404("No cart")
     return cart
 # --- End Helper Function ---
 
@@ -56,33 +48,24 @@ class CartViewSet(viewsets.ViewSet):
     # GET /api/cart/
     def list(self, request):
         """Retrieve the current user's or session's cart."""
-        cart = get_or_create_cart(request)
-        serializer = CartSerializer(cart)
-        
-        response = Response(serializer.data)
-        
-        # If it's a new anonymous cart, set the session key as a cookie
-        if cart.session_key and not request.COOKIES.get('cart_id'):
-            # Set the cookie with the unique cart ID
-            response.set_cookie(
-                key='cart_id',
-                value=str(cart.session_key),
-                max_age=settings.SESSION_COOKIE_AGE, # Or whatever duration you prefer
-                httponly=True, # Prevent client-side JS access for security
-                samesite='Lax'
-            )
-            
-        return response
+        # Visitors without a cart get an empty one that is never written
+        cart = get_cart(request)
+        if cart is None:
+            return Response(CartSerializer(load_cart(empty_cart())).data)
+
+        serializer = CartSerializer(load_cart(cart, save_summary=True))
+        return Response(serializer.data)
 
     # POST /api/cart/add_item/
     @action(detail=False, methods=['post'], url_path='add_item')
     def add_item(self, request):
         """Add a product to the cart or increase its quantity."""
-        cart = get_or_create_cart(request)
-        
         # We use the CartItemSerializer to validate incoming data
         serializer = CartItemSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+
+        # First add is where an anonymous cart gets persisted
+        cart = get_cart(request, create=True)
         
         product_id = serializer.validated_data['product_id']
         quantity = serializer.validated_data.get('quantity', 1)
@@ -103,14 +86,20 @@ class CartViewSet(viewsets.ViewSet):
             created = True
         
         # Re-serialize the item to return the updated cart state
-        response_serializer = CartSerializer(cart)
-        return Response(response_serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+        response_serializer = CartSerializer(load_cart(cart, save_summary=True))
+        response = Response(response_serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+        # Hand anonymous visitors the signed cookie for their new cart
+        if cart.session_key and anonymous_cart_key(request) != cart.session_key:
+            set_cart_cookie(response, cart, max_age=settings.SESSION_COOKIE_AGE)
+
+        return response
 
     # PUT/PATCH /api/cart/update_item/{item_id}/
     @action(detail=False, methods=['patch'], url_path='update_item/(?P<item_pk>[^/.]+)')
     def update_item(self, request, item_pk=None):
         """Update the quantity of a specific cart item."""
-        cart = get_or_create_cart(request)
+        cart = get_cart_or_404(request)
         
         # Find the specific item in *this* cart
         item = get_object_or_404(CartItem, cart=cart, pk=item_pk)
@@ -126,27 +115,52 @@ class CartViewSet(viewsets.ViewSet):
         item.quantity = new_quantity
         item.save()
         
-        response_serializer = CartSerializer(cart)
+        response_serializer = CartSerializer(load_cart(cart, save_summary=True))
         return Response(response_serializer.data)
 
     # DELETE /api/cart/remove_item/{item_id}/
     @action(detail=False, methods=['delete'], url_path='remove_item/(?P<item_pk>[^/.]+)')
     def remove_item(self, request, item_pk=None):
         """Remove a specific cart item."""
-        cart = get_or_create_cart(request)
+        cart = get_cart_or_404(request)
         
         # Find the specific item in *this* cart and delete it
         item = get_object_or_404(CartItem, cart=cart, pk=item_pk)
         item.delete()
         
-        response_serializer = CartSerializer(cart)
+        response_serializer = CartSerializer(load_cart(cart, save_summary=True))
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
 
     @action(detail=False, methods=['delete'], url_path='clear')
     def clear(self, request):
-        cart = get_object_or_404(Cart)
+        cart = get_cart(request)
+        if cart is None:
+            return Response(CartSerializer(load_cart(empty_cart())).data)
         cart.clear_cart()
         
-        response_serializer = CartSerializer(cart)
-        return Response(response_serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        response_serializer = CartSerializer(load_cart(cart))
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+    # GET /api/cart/summary/
+    @action(detail=False, methods=['get'], url_path='summary')
+    def summary(self, request):
+        """Stored item count, quantity and subtotal for the header badge."""
+        summary = get_summary(
+            user=request.user,
+            session_key=anonymous_cart_key(request),
+        )
+        return Response(summary)
+
+    # POST /api/cart/merge/
+    @action(detail=False, methods=['post'], url_path='merge', permission_classes=[IsAuthenticated])
+    def merge(self, request):
+        """Fold the anonymous cart from the cookie into the signed-in user's cart."""
+        cart = merge_anonymous_cart(request.user, anonymous_cart_key(request))
+        if cart is None:
+            cart = get_cart(request) or empty_cart()
+            load_cart(cart)
+
+        response = Response(CartSerializer(cart).data)
+        response.delete_cookie(CART_COOKIE)
+        return response
\ No newline at end of file
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.11 on 2026-10-18 07:56
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_summaries(apps, schema_editor):
+    Cart = apps.get_model('carts', 'Cart')
+    CartItem = apps.get_model('carts', 'CartItem')
+
+    counts = CartItem.objects.values('cart_id').annotate(items=Count('id'), quantity=Sum('quantity'))
+    subtotals = {}
+    for item in CartItem.objects.select_related('product').iterator():
+        product = item.product
+        price = product.sale_price if product.is_on_sale and product.sale_price is not None else product.original_price
+        subtotals[item.cart_id] = subtotals.get(item.cart_id, Decimal('0')) + price * item.quantity
+
+    for row in counts:
+        Cart.objects.filter(pk=row['cart_id']).update(
+            total_items=row['items'],
+            total_quantity=row['quantity'],
+            subtotal=subtotals.get(row['cart_id'], 0),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carts', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_items',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='total_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
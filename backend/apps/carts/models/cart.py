@@ -7,13 +7,19 @@ class Cart(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.CASCADE, 
-        null=False, 
-        blank=False, 
+        null=True, 
+        blank=True, 
         related_name='carts'
     )
     # Used to track anonymous carts via a session/cookie key
     session_key = models.CharField(max_length=40, null=True, blank=True, unique=True)
     
+    # Stored summary for the header badge, rewritten by apps/carts/services.py
+    # whenever the cart is changed through the API
+    total_items = models.PositiveIntegerField(default=0)
+    total_quantity = models.PositiveIntegerField(default=0)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -22,16 +28,6 @@ class Cart(models.Model):
             return f"Cart for {self.user.email}"
         return f"Anonymous Cart {self.id}"
 
-    @property
-    def total_items(self):
-        """Returns the total number of distinct items in the cart."""
-        return self.items.count()
-
-    @property
-    def total_quantity(self):
-        """Returns the sum of all item quantities in the cart."""
-        return sum(item.quantity for item in self.items.all())
-
     @property
     def get_cart_total(self):
         """Calculates the subtotal of all items in the cart."""
@@ -44,7 +40,10 @@ class Cart(models.Model):
     def clear_cart(self):
         """Clear all items from cart"""
         self.items.all().delete()
-        self.save() 
+        self.total_items = 0
+        self.total_quantity = 0
+        self.subtotal = 0
+        self.save()
 
     class Meta:
         ordering = ['-created_at']
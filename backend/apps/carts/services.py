@@ -0,0 +1,172 @@
+# carts/services.py
+import uuid
+from decimal import Decimal
+
+from django.db import transaction
+
+from .models import Cart, CartItem
+
+SUMMARY_FIELDS = ("total_items", "total_quantity", "subtotal")
+
+# Anonymous carts are identified by a signed cookie holding Cart.session_key.
+# The row only exists once the visitor adds their first item.
+CART_COOKIE = "cart_id"
+CART_COOKIE_SALT = "carts.cart_id"
+
+
+def cart_items_queryset():
+    """
+    Cart lines with their product and primary image: one query for the
+    whole cart whatever its size.
+    """
+    return CartItem.objects.select_related("product__primary_image").order_by("created_at")
+
+
+def summarize(lines):
+    subtotal = Decimal("0")
+    quantity = 0
+    for line in lines:
+        subtotal += line.product.effective_price * line.quantity
+        quantity += line.quantity
+    return {
+        "total_items": len(lines),
+        "total_quantity": quantity,
+        "subtotal": subtotal,
+    }
+
+
+def load_cart(cart, save_summary=False):
+    """
+    Loads the cart lines once and computes the totals from them in memory.
+
+    The lines are kept on ``cart.lines`` for CartSerializer. With
+    ``save_summary`` the stored summary is written back when it changed,
+    which the views do after every add/update/remove.
+    """
+    # an empty cart that was never saved has no lines to load
+    cart.lines = [] if cart._state.adding else list(cart_items_queryset().filter(cart=cart))
+    summary = summarize(cart.lines)
+
+    changed = any(getattr(cart, field) != value for field, value in summary.items())
+    for field, value in summary.items():
+        setattr(cart, field, value)
+
+    if save_summary and changed:
+        Cart.objects.filter(pk=cart.pk).update(**summary)
+    return cart
+
+
+def get_summary(user=None, session_key=None):
+    """Stored summary for the header badge, without touching the cart lines."""
+    carts = Cart.objects.none()
+    if user is not None and user.is_authenticated:
+        carts = Cart.objects.filter(user=user)
+    elif session_key:
+        carts = Cart.objects.filter(session_key=session_key, user__isnull=True)
+
+    summary = carts.values(*SUMMARY_FIELDS).first()
+    return summary or {"total_items": 0, "total_quantity": 0, "subtotal": Decimal("0")}
+
+
+def quantities_in_cart(request, product_ids):
+    """``{product_id: quantity}`` for the listed products in the caller's cart, in one query."""
+    lines = CartItem.objects.none()
+    if request.user.is_authenticated:
+        lines = CartItem.objects.filter(cart__user=request.user)
+    else:
+        session_key = anonymous_cart_key(request)
+        if session_key:
+            lines = CartItem.objects.filter(cart__session_key=session_key, cart__user__isnull=True)
+
+    if not product_ids:
+        return {}
+    return dict(lines.filter(product_id__in=product_ids).values_list("product_id", "quantity"))
+
+
+# --------------------------------------
+# Resolving the caller's cart
+# --------------------------------------
+
+def anonymous_cart_key(request):
+    """The session key from the signed cart cookie, ``None`` if missing or tampered with."""
+    return request.get_signed_cookie(CART_COOKIE, default=None, salt=CART_COOKIE_SALT)
+
+
+def set_cart_cookie(response, cart, max_age):
+    response.set_signed_cookie(
+        CART_COOKIE,
+        cart.session_key,
+        salt=CART_COOKIE_SALT,
+        max_age=max_age,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def empty_cart():
+    """An unsaved cart for callers that have not added anything yet."""
+    return Cart(id=None)
+
+
+def get_cart(request, create=False):
+    """
+    Returns the caller's cart, or ``None`` when they have none.
+
+    Reads never create rows, so browsing visitors and bots cost no writes.
+    ``create`` is only passed by add_item, which persists the cart the
+    first time something goes into it.
+    """
+    if request.user.is_authenticated:
+        cart = Cart.objects.filter(user=request.user).first()
+        if cart is None and create:
+            cart = Cart.objects.create(user=request.user)
+        return cart
+
+    cart = None
+    session_key = anonymous_cart_key(request)
+    if session_key:
+        cart = Cart.objects.filter(session_key=session_key, user__isnull=True).first()
+    if cart is None and create:
+        cart = Cart.objects.create(session_key=uuid.uuid4().hex)
+    return cart
+
+
+@transaction.atomic
+def merge_anonymous_cart(user, session_key):
+    """
+    Folds the anonymous cart behind ``session_key`` into ``user``'s cart.
+
+    Quantities of products already in the user's cart are added together and
+    every line is written with one ``INSERT ... ON CONFLICT`` upsert. The
+    anonymous cart is deleted afterwards. Returns the user's cart, or
+    ``None`` when there was nothing to merge.
+    """
+    if not session_key:
+        return None
+
+    anonymous = (
+        Cart.objects.select_for_update()
+        .filter(session_key=session_key, user__isnull=True)
+        .first()
+    )
+    if anonymous is None:
+        return None
+
+    cart = Cart.objects.filter(user=user).first() or Cart.objects.create(user=user)
+
+    quantities = dict(cart.items.values_list("product_id", "quantity"))
+    for product_id, quantity in anonymous.items.values_list("product_id", "quantity"):
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+    CartItem.objects.bulk_create(
+        [
+            CartItem(cart=cart, product_id=product_id, quantity=quantity)
+            for product_id, quantity in quantities.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["cart", "product"],
+        update_fields=["quantity", "updated_at"],
+    )
+    anonymous.delete()
+
+    return load_cart(cart, save_summary=True)
@@ -0,0 +1,13 @@
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .services import anonymous_cart_key, merge_anonymous_cart
+
+
+@receiver(user_logged_in, dispatch_uid="carts.merge_anonymous_cart")
+def merge_cart_on_login(sender, request, user, **kwargs):
+    # session logins (dj-rest-auth, admin) still carry the cart cookie;
+    # JWT clients call POST /api/cart/merge/ instead
+    if request is None:
+        return
+    merge_anonymous_cart(user, anonymous_cart_key(request))
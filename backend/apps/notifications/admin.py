@@ -1,6 +1,8 @@
 # admin.py
 from django.contrib import admin
-from .models import Notification, NotificationTemplate, UserNotificationPreference
+from django.utils import timezone
+from . import counters
+from .models import Notification, NotificationOutbox, NotificationTemplate, UserNotificationPreference
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
@@ -11,10 +13,12 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
 
     def mark_as_read(self, request, queryset):
+        counters.forget(queryset.values_list('user_id', flat=True))
         queryset.update(is_read=True)
     mark_as_read.short_description = "Mark selected notifications as read"
 
     def mark_as_unread(self, request, queryset):
+        counters.forget(queryset.values_list('user_id', flat=True))
         queryset.update(is_read=False)
     mark_as_unread.short_description = "Mark selected notifications as unread"
 
@@ -28,4 +32,16 @@ class NotificationTemplateAdmin(admin.ModelAdmin):
 class UserNotificationPreferenceAdmin(admin.ModelAdmin):
     list_display = ['user', 'email_enabled', 'push_enabled', 'sms_enabled', 'in_app_enabled']
     list_filter = ['email_enabled', 'push_enabled', 'sms_enabled', 'in_app_enabled']
-    search_fields = ['user__username']
\ No newline at end of file
+    search_fields = ['user__username']
+
+@admin.register(NotificationOutbox)
+class NotificationOutboxAdmin(admin.ModelAdmin):
+    list_display = ['user', 'title', 'status', 'attempts', 'next_attempt_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['user__email', 'title']
+    readonly_fields = ['created_at', 'sent_at', 'notification']
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        queryset.update(status='pending', next_attempt_at=timezone.now(), locked_until=None)
+    retry_now.short_description = "Retry selected notifications now"
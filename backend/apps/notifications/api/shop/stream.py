@@ -0,0 +1,102 @@
+# notifications/stream.py
+"""
+GET /api/notifications/stream/
+
+Server-sent events for the signed-in user: new notifications and status
+changes of their sub-orders. This is a plain async Django view, so it must
+be served through config/asgi.py. There, each idle connection is a
+suspended coroutine waiting on its queue (see integrations/pubsub.py),
+not a worker thread.
+
+EventSource cannot send headers, so the JWT access token may also be
+passed as ``?token=``. Notification events carry their id. On reconnect the
+browser sends ``Last-Event-ID`` and anything missed is replayed from the
+table first. Served through config/wsgi.py instead, the view answers 501
+and clients keep polling /api/notifications/.
+"""
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from apps.notifications.events import notification_event
+from apps.notifications.models import Notification
+from integrations import pubsub
+
+HEARTBEAT_INTERVAL = 20
+RETRY_MS = 5000
+REPLAY_LIMIT = 50
+
+
+def _authenticate(request):
+    auth = JWTAuthentication()
+    try:
+        token = request.GET.get('token')
+        if token:
+            return auth.get_user(auth.get_validated_token(token))
+        result = auth.authenticate(request)
+        return result[0] if result else None
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def _missed(user, last_event_id):
+    try:
+        last_event_id = int(last_event_id)
+    except (TypeError, ValueError):
+        return []
+    return list(
+        Notification.objects.filter(user=user, pk__gt=last_event_id).order_by('pk')[:REPLAY_LIMIT]
+    )
+
+
+def _format(event):
+    lines = [f"event: {event['type']}"]
+    if event['type'] == 'notification':
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {json.dumps(event, cls=DjangoJSONEncoder)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _events(user, last_event_id):
+    # subscribe before replaying so nothing published in between is lost
+    async with pubsub.subscribe(user.pk) as queue:
+        yield f"retry: {RETRY_MS}\n\n"
+
+        if last_event_id:
+            for notification in await sync_to_async(_missed)(user, last_event_id):
+                yield _format(notification_event(notification))
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield _format(event)
+
+
+async def notification_stream(request):
+    # under WSGI every open stream would pin a worker thread forever
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Streaming needs the ASGI server, poll /api/notifications/ instead."}, status=501
+        )
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    response = StreamingHttpResponse(_events(user, last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
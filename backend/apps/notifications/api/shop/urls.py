@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .stream import notification_stream
+from .views import NotificationViewSet
+
+router = DefaultRouter()
+router.register(r"", NotificationViewSet, basename="notifications")
+
+urlpatterns = [
+    path("stream/", notification_stream, name="notification-stream"),
+    path("", include(router.urls)),
+]
@@ -0,0 +1,54 @@
+# notifications/views.py
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.notifications import counters
+from apps.notifications.models import Notification
+from common.pagination import NotificationCursorPagination
+from .serializers import MarkReadSerializer, NotificationSerializer
+
+
+class NotificationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    The signed-in user's inbox.
+    Pages are keyset cursors over (-created_at, -id); ?unread=1 narrows to unread.
+    """
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(user=self.request.user)
+        if self.request.query_params.get('unread') in ('1', 'true', 'True'):
+            queryset = queryset.filter(is_read=False)
+        if self.request.query_params.get('category'):
+            queryset = queryset.filter(category=self.request.query_params['category'])
+        return queryset
+
+    # GET /api/notifications/unread_count/
+    @action(detail=False, methods=['get'])
+    def unread_count(self, request):
+        return Response({"unread": counters.unread_count(request.user.pk)})
+
+    # POST /api/notifications/mark_read/  {"ids": [...]}
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # one UPDATE; is_read=False keeps the count to rows that actually changed
+        updated = Notification.objects.filter(
+            user=request.user, pk__in=serializer.validated_data['ids'], is_read=False
+        ).update(is_read=True)
+        counters.decrement(request.user.pk, updated)
+
+        return Response({"updated": updated, "unread": counters.unread_count(request.user.pk)})
+
+    # POST /api/notifications/mark_all_read/
+    @action(detail=False, methods=['post'])
+    def mark_all_read(self, request):
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+        counters.reset(request.user.pk)
+        return Response({"updated": updated, "unread": 0})
@@ -0,0 +1,166 @@
+"""
+Bulk notification fan-out.
+
+The audience is walked in primary-key order, ``chunk_size`` users at a
+time, so a broadcast to every customer of a merchant never holds the whole
+audience in memory. Each chunk costs one SELECT (users joined to their
+preferences), one ``bulk_create`` of Notification rows and one UPDATE
+marking them sent. Email for the whole broadcast goes over a single SMTP
+connection. A chunk whose email fails is handed to the outbox, which
+retries it with backoff without creating the in-app rows again.
+"""
+import logging
+from dataclasses import dataclass
+
+from django.contrib.auth import get_user_model
+from django.core.mail import get_connection
+from django.db.models import QuerySet
+
+from . import counters, events
+from .models import Notification, NotificationChannel, NotificationOutbox, UserNotificationPreference
+from .outbox import build_email
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+CHUNK_SIZE = 1000
+
+
+@dataclass
+class BroadcastProgress:
+    users: int = 0
+    notified: int = 0
+    emailed: int = 0
+    email_deferred: int = 0
+    chunks: int = 0
+
+
+def _preference_defaults():
+    return {
+        channel: UserNotificationPreference._meta.get_field(f"{channel}_enabled").default
+        for channel in NotificationChannel.values
+    }
+
+
+def _audience(users):
+    """Any user queryset, or a list of users, as a queryset we can page by pk."""
+    if isinstance(users, QuerySet):
+        return users.order_by()
+    return User.objects.filter(pk__in=[user.pk for user in users])
+
+
+def _chunks(users, chunk_size):
+    """
+    Yields ``[(user_id, email, {channel: enabled})]`` lists, paging by primary
+    key so every chunk is a fresh, bounded query.
+    """
+    defaults = _preference_defaults()
+    columns = [f"notification_preferences__{channel}_enabled" for channel in NotificationChannel.values]
+    audience = _audience(users).values_list("pk", "email", *columns).order_by("pk")
+
+    last_pk = None
+    while True:
+        page = audience if last_pk is None else audience.filter(pk__gt=last_pk)
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield [
+            (
+                pk,
+                email,
+                # users without a preference row get the model defaults
+                {
+                    channel: defaults[channel] if enabled is None else enabled
+                    for channel, enabled in zip(NotificationChannel.values, flags)
+                },
+            )
+            for pk, email, *flags in rows
+        ]
+
+
+def fan_out(users, title, message, channels=None, html_message=None,
+            chunk_size=CHUNK_SIZE, progress=None, **fields):
+    """
+    Sends one notification to every user in ``users`` and returns the
+    ``BroadcastProgress`` totals. ``progress`` is called with the running
+    totals after each chunk.
+    """
+    if channels is None:
+        channels = [NotificationChannel.IN_APP]
+
+    totals = BroadcastProgress()
+    connection = None
+    try:
+        for chunk in _chunks(users, chunk_size):
+            notifications, recipients = [], []
+            for user_id, email, enabled in chunk:
+                user_channels = [channel for channel in channels if enabled.get(channel, True)]
+                if not user_channels:
+                    continue
+                notification = Notification(
+                    user_id=user_id,
+                    title=title,
+                    message=message,
+                    html_message=html_message,
+                    channels=",".join(user_channels),
+                    **fields,
+                )
+                notifications.append(notification)
+                if NotificationChannel.EMAIL in user_channels:
+                    recipients.append((notification, email))
+
+            Notification.objects.bulk_create(notifications)
+            counters.forget(n.user_id for n in notifications)
+            events.publish_notifications(notifications)
+
+            delivered = [n for n in notifications if NotificationChannel.EMAIL not in n.channels.split(",")]
+            if recipients:
+                try:
+                    if connection is None:
+                        # opened here so send_messages() keeps it for later chunks
+                        connection = get_connection(fail_silently=False)
+                        connection.open()
+                    connection.send_messages([
+                        build_email(email, title, message, html_message) for _, email in recipients
+                    ])
+                    delivered += [notification for notification, _ in recipients]
+                    totals.emailed += len(recipients)
+                except Exception as e:
+                    logger.warning(f"Broadcast email chunk failed, deferring to the outbox: {e}")
+                    _defer(recipients, title, message, html_message, fields)
+                    totals.email_deferred += len(recipients)
+                    # start over with a fresh connection for the next chunk
+                    connection.close()
+                    connection = None
+
+            Notification.objects.filter(pk__in=[n.pk for n in delivered]).update(is_sent=True)
+
+            totals.users += len(chunk)
+            totals.notified += len(notifications)
+            totals.chunks += 1
+            logger.info(f"Broadcast '{title}': {totals}")
+            if progress is not None:
+                progress(totals)
+    finally:
+        if connection is not None:
+            connection.close()
+
+    return totals
+
+
+def _defer(recipients, title, message, html_message, fields):
+    NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(
+            user_id=notification.user_id,
+            notification=notification,
+            title=title,
+            message=message,
+            html_message=html_message,
+            channels=NotificationChannel.EMAIL,
+            action_url=fields.get("action_url"),
+            category=fields.get("category"),
+            template=fields.get("template"),
+        )
+        for notification, _ in recipients
+    ])
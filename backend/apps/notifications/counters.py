@@ -0,0 +1,96 @@
+"""
+Unread notification counters.
+
+The badge count lives in the cache under the NOTIFICATIONS namespace, so
+showing it is one cache read rather than a COUNT(*) per page load.
+
+- Reads compute the count once on a miss and cache it.
+- Mark-read endpoints decrement it by the number of rows their UPDATE
+  changed.
+- New notifications are written with bulk_create, which sends no
+  signals, so their writers call ``forget`` and the next read recounts.
+
+Counters expire after ``COUNTER_TIMEOUT``, and the
+reconcile_unread_counts command rewrites them from the table. Drift from a
+lost race is therefore bounded.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from integrations import redis as cache_tier
+from .models import Notification
+
+COUNTER_TIMEOUT = 60 * 60 * 6
+
+
+def _key(user_id):
+    return cache_tier.make_key(cache_tier.NOTIFICATIONS, "unread", user_id)
+
+
+def _keys(user_ids):
+    # resolves the namespace version once for the whole batch
+    prefix = cache_tier.make_key(cache_tier.NOTIFICATIONS, "unread")
+    return [f"{prefix}:{user_id}" for user_id in user_ids]
+
+
+def unread_count(user_id):
+    key = _key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.add(key, count, COUNTER_TIMEOUT)
+    return count
+
+
+def decrement(user_id, by):
+    if not by:
+        return
+    key = _key(user_id)
+    try:
+        if cache.decr(key, by) < 0:
+            cache.delete(key)
+    except ValueError:
+        # not cached: the next read counts from the table
+        pass
+
+
+def reset(user_id):
+    cache.set(_key(user_id), 0, COUNTER_TIMEOUT)
+
+
+def forget(user_ids):
+    """Drops the counters of ``user_ids`` once the current transaction commits."""
+    keys = _keys(set(user_ids))
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def reconcile(batch_size=1000):
+    """
+    Rewrites every counter from one grouped query over users that have
+    notifications. Returns the number of counters written.
+    """
+    rows = (
+        Notification.objects.order_by()
+        .values("user_id")
+        .annotate(unread=Count("id", filter=Q(is_read=False)))
+        .values_list("user_id", "unread")
+    )
+
+    written = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            written += _write(batch)
+            batch = []
+    return written + _write(batch)
+
+
+def _write(rows):
+    if not rows:
+        return 0
+    keys = _keys(user_id for user_id, _ in rows)
+    cache.set_many(dict(zip(keys, (unread for _, unread in rows))), COUNTER_TIMEOUT)
+    return len(rows)
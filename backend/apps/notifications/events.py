@@ -0,0 +1,44 @@
+"""
+Push events for the live stream (see api/shop/stream.py).
+
+Events are published after the surrounding transaction commits, so a
+client never hears about a row it cannot read yet.
+"""
+from django.db import transaction
+
+from integrations import pubsub
+
+
+def notification_event(notification):
+    return {
+        "type": "notification",
+        "id": notification.pk,
+        "title": notification.title,
+        "message": notification.message,
+        "category": notification.category,
+        "action_url": notification.action_url,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def publish_notifications(notifications):
+    events = [(n.user_id, notification_event(n)) for n in notifications if n.pk]
+    if not events:
+        return
+
+    def run():
+        for user_id, event in events:
+            pubsub.publish(user_id, event)
+
+    transaction.on_commit(run)
+
+
+def publish_sub_order_status(user_id, sub_order):
+    event = {
+        "type": "sub_order.status",
+        "sub_order_id": str(sub_order.pk),
+        "sub_order_number": sub_order.sub_order_number,
+        "order_id": str(sub_order.order_id),
+        "status": sub_order.status,
+    }
+    transaction.on_commit(lambda: pubsub.publish(user_id, event))
@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notifications.broadcast import CHUNK_SIZE
+from apps.notifications.models import NotificationChannel
+from apps.notifications.services import NotificationService
+from apps.users.models import Merchant
+
+
+class Command(BaseCommand):
+    help = "Send one notification to every customer of a merchant, or to every active user."
+
+    def add_arguments(self, parser):
+        audience = parser.add_mutually_exclusive_group(required=True)
+        audience.add_argument('--merchant', help="Merchant id; notifies everyone who ordered from it.")
+        audience.add_argument('--all', action='store_true', help="Every active user.")
+        parser.add_argument('--title', required=True)
+        parser.add_argument('--message', required=True)
+        parser.add_argument('--channels', default=NotificationChannel.IN_APP,
+                            help="Comma separated, e.g. in_app,email")
+        parser.add_argument('--category')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(is_active=True)
+        if options['merchant']:
+            if not Merchant.objects.filter(pk=options['merchant']).exists():
+                raise CommandError(f"Merchant {options['merchant']} does not exist")
+            users = users.filter(orders__sub_orders__merchant_id=options['merchant']).distinct()
+
+        channels = [channel for channel in options['channels'].split(',') if channel]
+        unknown = set(channels) - set(NotificationChannel.values)
+        if unknown:
+            raise CommandError(f"Unknown channel(s): {', '.join(sorted(unknown))}")
+
+        def progress(totals):
+            self.stdout.write(
+                f"chunk {totals.chunks}: {totals.users} users, {totals.notified} notified, "
+                f"{totals.emailed} emailed, {totals.email_deferred} deferred to the outbox"
+            )
+
+        totals = NotificationService.send_bulk_notification(
+            users,
+            options['title'],
+            options['message'],
+            channels=channels,
+            category=options['category'],
+            chunk_size=options['chunk_size'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Notified {totals.notified} of {totals.users} user(s)"))
@@ -0,0 +1,56 @@
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from apps.notifications import outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued notifications from the outbox. Runs until stopped, "
+        "or drains once with --once (for cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Threads claiming batches in parallel.")
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help="Seconds to sleep when the outbox is empty.")
+        parser.add_argument('--once', action='store_true')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        if not options['once']:
+            signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+            signal.signal(signal.SIGINT, lambda *_: self.stopping.set())
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [
+                pool.submit(self.work, options['batch_size'], options['interval'], options['once'])
+                for _ in range(options['workers'])
+            ]
+            results = [future.result() for future in futures]
+
+        sent = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} notification(s), {failed} failed and queued for retry"))
+
+    def work(self, batch_size, interval, once):
+        sent = failed = 0
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                batch_sent, batch_failed = outbox.drain(batch_size)
+                sent += batch_sent
+                failed += batch_failed
+                if once:
+                    break
+                self.stopping.wait(interval)
+        finally:
+            # each thread has its own connection
+            connection.close()
+        return sent, failed
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications import counters
+
+
+class Command(BaseCommand):
+    help = "Rewrite the cached unread-notification counters from the database. Run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        written = counters.reconcile(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {written} unread counter(s)"))
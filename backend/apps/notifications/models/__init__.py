@@ -1 +1,2 @@
-from .notifications import Notification, NotificationChannel, NotificationTemplate, UserNotificationPreference
\ No newline at end of file
+from .notifications import Notification, NotificationChannel, NotificationTemplate, UserNotificationPreference
+from .outbox import NotificationOutbox, OutboxStatus
@@ -50,6 +50,8 @@ class Notification(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['user', 'is_read', 'created_at']),
+            # inbox pages: keyset over (-created_at, -id) per user
+            models.Index(fields=['user', '-created_at', '-id']),
             models.Index(fields=['user', 'category']),
             models.Index(fields=['is_sent']),
         ]
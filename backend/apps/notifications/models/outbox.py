@@ -0,0 +1,52 @@
+# models/outbox.py
+from django.db import models
+from django.utils import timezone
+
+from .notifications import NotificationChannel
+
+
+class OutboxStatus(models.TextChoices):
+    PENDING = 'pending', 'Pending'
+    SENT = 'sent', 'Sent'
+    FAILED = 'failed', 'Failed'
+
+
+class NotificationOutbox(models.Model):
+    """
+    A notification waiting to be delivered.
+
+    Requests only insert a row here; the process_notifications worker
+    applies preferences, creates the in-app Notification and sends email.
+    """
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name='notification_outbox')
+    template = models.ForeignKey("notifications.NotificationTemplate", on_delete=models.SET_NULL, null=True, blank=True)
+
+    # Payload, copied onto the Notification on delivery
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    html_message = models.TextField(blank=True, null=True)
+    channels = models.CharField(max_length=50, default=NotificationChannel.IN_APP)
+    action_url = models.URLField(blank=True, null=True)
+    category = models.CharField(max_length=50, blank=True, null=True)
+
+    # Delivery state
+    status = models.CharField(max_length=10, choices=OutboxStatus.choices, default=OutboxStatus.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # a worker owns the row until this passes; a crashed worker's rows are picked up again
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    # set once the in-app row exists, so a retry only redoes the email
+    notification = models.ForeignKey("notifications.Notification", on_delete=models.SET_NULL, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.title} ({self.status})"
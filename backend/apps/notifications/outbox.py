@@ -0,0 +1,215 @@
+"""
+Notification outbox.
+
+``enqueue`` is the only thing a request does: one INSERT into
+NotificationOutbox, inside the caller's transaction, so a notification is
+queued if and only if the change that caused it commits.
+
+The process_notifications worker claims due rows in batches under a
+short lease, delivers them and records the outcome. Failed deliveries are
+retried with exponential backoff until ``MAX_ATTEMPTS``; after that the
+row is left as ``failed`` for inspection in the admin.
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from . import counters, events
+from .models import (
+    Notification,
+    NotificationChannel,
+    NotificationOutbox,
+    OutboxStatus,
+    UserNotificationPreference,
+)
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 6)
+# retry n waits BACKOFF_BASE * 2**(n-1), capped at BACKOFF_MAX, plus jitter
+BACKOFF_BASE = getattr(settings, "NOTIFICATION_BACKOFF_BASE", timedelta(seconds=30))
+BACKOFF_MAX = getattr(settings, "NOTIFICATION_BACKOFF_MAX", timedelta(hours=1))
+LEASE = timedelta(minutes=5)
+
+
+def enqueue(user, title, message, channels=None, html_message=None, **fields):
+    if channels is None:
+        channels = [NotificationChannel.IN_APP]
+    return NotificationOutbox.objects.create(
+        user=user,
+        title=title,
+        message=message,
+        html_message=html_message,
+        channels=",".join(channels),
+        **fields,
+    )
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * (2 ** (attempts - 1)), BACKOFF_MAX)
+    return delay + delay * random.uniform(0, 0.1)
+
+
+def claim_batch(batch_size=BATCH_SIZE, now=None):
+    """
+    Leases up to ``batch_size`` due rows to the calling worker.
+
+    ``skip_locked`` lets several workers claim concurrently without waiting
+    on each other; the lease keeps the rows theirs after the claim commits.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboxStatus.PENDING, next_attempt_at__lte=now)
+            .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+            .order_by("next_attempt_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        NotificationOutbox.objects.filter(pk__in=ids).update(locked_until=now + LEASE)
+
+    return list(
+        NotificationOutbox.objects.filter(pk__in=ids)
+        .select_related("user")
+        .order_by("next_attempt_at")
+    )
+
+
+def _preferences(user_ids):
+    """Preferences for every user in one query, creating the missing defaults in bulk."""
+    preferences = {
+        preference.user_id: preference
+        for preference in UserNotificationPreference.objects.filter(user_id__in=user_ids)
+    }
+    missing = [user_id for user_id in user_ids if user_id not in preferences]
+    if missing:
+        UserNotificationPreference.objects.bulk_create(
+            [UserNotificationPreference(user_id=user_id) for user_id in missing],
+            ignore_conflicts=True,
+        )
+        for preference in UserNotificationPreference.objects.filter(user_id__in=missing):
+            preferences[preference.user_id] = preference
+    return preferences
+
+
+def _enabled_channels(entry, preference):
+    return [
+        channel for channel in entry.channels.split(",")
+        if channel and getattr(preference, f"{channel}_enabled", True)
+    ]
+
+
+def build_email(to, subject, message, html_message=None):
+    email = EmailMultiAlternatives(
+        subject=subject,
+        body=strip_tags(message),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[to],
+    )
+    email.attach_alternative(html_message or message, "text/html")
+    return email
+
+
+def process_batch(entries):
+    """
+    Delivers claimed rows and returns ``(sent, failed)``.
+
+    In-app rows are created with one ``bulk_create`` and all email in the
+    batch goes over a single SMTP connection.
+    """
+    if not entries:
+        return 0, 0
+
+    preferences = _preferences({entry.user_id for entry in entries})
+    channels = {entry.pk: _enabled_channels(entry, preferences[entry.user_id]) for entry in entries}
+
+    # in-app rows, skipping entries that already got one on an earlier attempt
+    new_notifications = {
+        entry.pk: Notification(
+            user_id=entry.user_id,
+            template_id=entry.template_id,
+            title=entry.title,
+            message=entry.message,
+            html_message=entry.html_message,
+            channels=",".join(channels[entry.pk]),
+            action_url=entry.action_url,
+            category=entry.category,
+        )
+        for entry in entries
+        if channels[entry.pk] and entry.notification_id is None
+    }
+    if new_notifications:
+        Notification.objects.bulk_create(new_notifications.values())
+        counters.forget(n.user_id for n in new_notifications.values())
+        events.publish_notifications(new_notifications.values())
+        linked = [entry for entry in entries if entry.pk in new_notifications]
+        for entry in linked:
+            entry.notification = new_notifications[entry.pk]
+        NotificationOutbox.objects.bulk_update(linked, ["notification"])
+
+    errors = {}
+    emails = [entry for entry in entries if NotificationChannel.EMAIL in channels[entry.pk]]
+    if emails:
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for entry in emails:
+                try:
+                    connection.send_messages([
+                        build_email(entry.user.email, entry.title, entry.message, entry.html_message)
+                    ])
+                except Exception as e:
+                    errors[entry.pk] = e
+        except Exception as e:
+            # could not reach the mail server at all: retry every email in the batch
+            for entry in emails:
+                errors.setdefault(entry.pk, e)
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    delivered = [entry for entry in entries if entry.pk not in errors]
+    NotificationOutbox.objects.filter(pk__in=[entry.pk for entry in delivered]).update(
+        status=OutboxStatus.SENT, sent_at=now, locked_until=None, last_error=""
+    )
+    Notification.objects.filter(
+        pk__in=[entry.notification_id for entry in delivered if entry.notification_id]
+    ).update(is_sent=True)
+
+    retries = [entry for entry in entries if entry.pk in errors]
+    for entry in retries:
+        entry.attempts += 1
+        gave_up = entry.attempts >= MAX_ATTEMPTS
+        entry.status = OutboxStatus.FAILED if gave_up else OutboxStatus.PENDING
+        entry.next_attempt_at = now if gave_up else now + backoff(entry.attempts)
+        entry.locked_until = None
+        entry.last_error = str(errors[entry.pk])[:1000]
+        logger.warning(
+            f"Notification {entry.pk} to {entry.user.email} failed "
+            f"(attempt {entry.attempts}/{MAX_ATTEMPTS}): {errors[entry.pk]}"
+        )
+    NotificationOutbox.objects.bulk_update(
+        retries, ["attempts", "status", "next_attempt_at", "locked_until", "last_error"]
+    )
+
+    return len(delivered), len(errors)
+
+
+def drain(batch_size=BATCH_SIZE):
+    """Processes due rows until none are left; returns ``(sent, failed)``."""
+    sent = failed = 0
+    while True:
+        entries = claim_batch(batch_size)
+        if not entries:
+            return sent, failed
+        batch_sent, batch_failed = process_batch(entries)
+        sent += batch_sent
+        failed += batch_failed
@@ -1,11 +1,9 @@
 # services/notification_service.py
-from django.core.mail import send_mail
-from django.utils.html import strip_tags
-from django.conf import settings
 from django.contrib.auth import get_user_model
 import logging
-from typing import List, Dict, Any
-from .models import Notification, NotificationChannel, UserNotificationPreference
+from typing import Iterable, List
+from . import broadcast, outbox
+from .models import NotificationOutbox
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -19,63 +17,49 @@ class NotificationService:
         message: str,
         channels: List[str] = None,
         html_message: str = None,
-    ) -> Notification:
+        **kwargs,
+    ) -> NotificationOutbox:
         """
-        Send a notification to a single user.
-        Supports in-app and email channels.
+        Queue a notification for a single user.
+        Preferences, the in-app row and email are handled by the
+        process_notifications worker (see notifications/outbox.py).
         """
-        if channels is None:
-            channels = [NotificationChannel.IN_APP]
-
-        # Get or create user preferences
-        preferences, _ = UserNotificationPreference.objects.get_or_create(user=user)
-
-        # Filter channels based on preferences
-        enabled_channels = [
-            channel for channel in channels if getattr(preferences, f"{channel}_enabled", True)
-        ]
-
-        if not enabled_channels:
-            logger.warning(f"No enabled channels for {user.email}")
-            return None
-
-        # Create in-app notification
-        notification = Notification.objects.create(
-            user=user,
-            title=title,
-            message=message,
-            channels=",".join(enabled_channels),
+        return outbox.enqueue(
+            user,
+            title,
+            message,
+            channels=channels,
+            html_message=html_message,
+            action_url=kwargs.get("action_url"),
+            category=kwargs.get("category"),
+            template=kwargs.get("template"),
         )
 
-        # Deliver email if enabled
-        if NotificationChannel.EMAIL in enabled_channels:
-            NotificationService._send_email(user, title, message, html_message)
-
-        return notification
-
     @staticmethod
     def send_bulk_notification(
-        users: List[User],
+        users: Iterable[User],
         title: str,
         message: str,
+        channels: List[str] = None,
+        html_message: str = None,
+        chunk_size: int = broadcast.CHUNK_SIZE,
+        progress=None,
         **kwargs,
-    ):
-        """Send notifications to multiple users"""
-        for user in users:
-            try:
-                NotificationService.send_notification(user, title, message, **kwargs)
-            except Exception as e:
-                logger.error(f"Failed to send notification to {user.email}: {e}")
-
-    @staticmethod
-    def _send_email(user: User, subject: str, message: str, html_message: str = None):
-        """Send email notification"""
-        plain_message = strip_tags(message)
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message or message,
-            fail_silently=True,
+    ) -> broadcast.BroadcastProgress:
+        """
+        Send a notification to many users at once.
+        ``users`` may be a queryset of any size; it is walked in chunks
+        (see notifications/broadcast.py).
+        """
+        return broadcast.fan_out(
+            users,
+            title,
+            message,
+            channels=channels,
+            html_message=html_message,
+            chunk_size=chunk_size,
+            progress=progress,
+            action_url=kwargs.get("action_url"),
+            category=kwargs.get("category"),
+            template=kwargs.get("template"),
         )
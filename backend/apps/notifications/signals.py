@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, events
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def forget_unread_counter(sender, instance, **kwargs):
+    # single-row writes (admin, Notification.mark_as_read); bulk writers call counters.forget themselves
+    counters.forget([instance.user_id])
+
+
+@receiver(post_save, sender=Notification)
+def publish_created_notification(sender, instance, created, **kwargs):
+    if created:
+        events.publish_notifications([instance])
@@ -0,0 +1,14 @@
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+
+class NotificationStreamTests(SimpleTestCase):
+    def test_answers_501_when_served_over_wsgi(self):
+        response = self.client.get(reverse("notification-stream"))
+
+        self.assertEqual(response.status_code, 501)
+
+    async def test_still_requires_a_token_over_asgi(self):
+        response = await self.async_client.get(reverse("notification-stream"))
+
+        self.assertEqual(response.status_code, 401)
@@ -1,11 +1,12 @@
 # order_manager/urls_merchant.py
 from django.urls import path
-from views import (
+from .views import (
     MerchantSubOrderListView,
     MerchantSubOrderDetailView,
     AcceptOrderView,
     RejectOrderView,
     ShipOrDeliverOrderView,
+    RefundOrderView,
 )
 
 urlpatterns = [
@@ -14,4 +15,5 @@ urlpatterns = [
     path("<uuid:id>/accept/", AcceptOrderView.as_view(), name="merchant-order-accept"),
     path("<uuid:id>/reject/", RejectOrderView.as_view(), name="merchant-order-reject"),
     path("<uuid:id>/ship/", ShipOrDeliverOrderView.as_view(), name="merchant-order-ship"),
+    path("<uuid:id>/refund/", RefundOrderView.as_view(), name="merchant-order-refund"),
 ]
@@ -2,7 +2,7 @@
 from rest_framework.generics import ListAPIView, RetrieveAPIView, UpdateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
-from orders.models.orders import SubOrder
+from apps.orders.models import SubOrder
 from .serializers import (
     MerchantSubOrderSerializer,
     UpdateSubOrderStatusSerializer
@@ -10,11 +10,15 @@ from .serializers import (
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.shortcuts import get_object_or_404
+from common.pagination import OrderCursorPagination
+from apps.orders.services import cancel_sub_order, mark_sub_order_delivered, refund_sub_order
 
 
 class MerchantSubOrderListView(ListAPIView):
     serializer_class = MerchantSubOrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -41,16 +45,31 @@ class MerchantSubOrderDetailView(RetrieveAPIView):
         return SubOrder.objects.filter(merchant=user.merchant)
 
 
+def get_merchant_sub_order(request, id):
+    """The sub-order ``id`` if it belongs to the requesting merchant, 404 otherwise."""
+    if not hasattr(request.user, 'merchant'):
+        raise PermissionDenied("You are not a merchant.")
+    return get_object_or_404(SubOrder, id=id, merchant=request.user.merchant)
+
+
+def invalid_transition(sub_order, action):
+    return Response(
+        {"error": f"Cannot {action} a {sub_order.status} order."},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
 # accept order
 class AcceptOrderView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, id):
-        sub_order = SubOrder.objects.get(id=id)
+        sub_order = get_merchant_sub_order(request, id)
         if sub_order.status == 'pending':
             sub_order.status = 'processing'
             sub_order.save()
             return Response({"status": "success"})
+        return invalid_transition(sub_order, "accept")
  
 
 # reject order
@@ -58,11 +77,12 @@ class RejectOrderView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, id):
-        sub_order = SubOrder.objects.get(id=id)
+        sub_order = get_merchant_sub_order(request, id)
         if sub_order.status == 'pending' or sub_order.status == 'processing':
-            sub_order.status = 'cancelled'
-            sub_order.save()
+            # puts the reserved stock back on the shelf
+            cancel_sub_order(sub_order)
             return Response({"status": "success"})
+        return invalid_transition(sub_order, "reject")
 
 
 # ship or deliver order
@@ -70,8 +90,26 @@ class ShipOrDeliverOrderView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, id):
-        sub_order = SubOrder.objects.get(id=id)
+        sub_order = get_merchant_sub_order(request, id)
         if sub_order.status == 'processing':
             sub_order.status = 'shipped'
             sub_order.save()
-            return Response({"status": "success"})
\ No newline at end of file
+            return Response({"status": "success"})
+        if sub_order.status == 'shipped':
+            # counts the sale if the order is paid on delivery
+            mark_sub_order_delivered(sub_order)
+            return Response({"status": "success"})
+        return invalid_transition(sub_order, "ship")
+
+
+# refund order
+class RefundOrderView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, id):
+        sub_order = get_merchant_sub_order(request, id)
+        if sub_order.status == 'shipped' or sub_order.status == 'delivered':
+            # takes the sale back out of the merchant and product counters
+            refund_sub_order(sub_order)
+            return Response({"status": "success"})
+        return invalid_transition(sub_order, "refund")
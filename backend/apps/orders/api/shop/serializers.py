@@ -8,6 +8,7 @@ from apps.products.models import (
 from apps.products.api import (
     ProductImageSerializer
 )
+from common.fieldsets import SparseFieldsMixin
 
 class PaymentInfoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -35,7 +36,7 @@ class SubOrderSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     sub_orders = SubOrderSerializer(many=True, read_only=True)
     payment = PaymentInfoSerializer(read_only=True)
     shipping_address = AddressSerializer(read_only=True)
@@ -51,3 +52,5 @@ class OrderSerializer(serializers.ModelSerializer):
             'shipping_address',
             'created_at'
         ]
+        # loaded only when listed in ?fields= or ?expand= (see OrderViewSet)
+        expandable_fields = ['sub_orders', 'payment', 'shipping_address']
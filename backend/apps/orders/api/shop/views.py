@@ -5,14 +5,42 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 from apps.carts.models import Cart, CartItem
-from apps.orders.models import Order, OrderItem, SubOrder, PaymentInfo, Address
-import uuid
-from rest_framework import viewsets
+from apps.orders.models import Order
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
 from .serializers import OrderItemSerializer, OrderSerializer, SubOrderSerializer
-
-class OrderViewSet(viewsets.ModelViewSet):
+from common.pagination import OrderCursorPagination
+from apps.orders.services import (
+    RELEASABLE_STATUSES, StockShortfall, cancel_sub_order, load_checkout_lines, place_order,
+)
+
+# orders are never edited or deleted by the buyer, only cancelled through
+# cancel_sub_order so their stock reservations are released
+class OrderViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
+):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = Order.objects.filter(user=self.request.user)
+
+        # ?fields= / ?expand= also decide what gets joined and prefetched
+        relations = OrderSerializer.selected_relations(self.request)
+        if relations is None:
+            relations = OrderSerializer.Meta.expandable_fields
+        joins = [name for name in ('payment', 'shipping_address') if name in relations]
+        if joins:
+            queryset = queryset.select_related(*joins)
+        if 'sub_orders' in relations:
+            queryset = queryset.prefetch_related('sub_orders__items')
+        return queryset
 
     # create order
     @transaction.atomic
@@ -26,7 +54,8 @@ class OrderViewSet(viewsets.ModelViewSet):
         except Cart.DoesNotExist:
             return Response({"error": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if cart.items.count() == 0:
+        lines = load_checkout_lines(cart)
+        if not lines:
             return Response({"error": "No items in cart"}, status=status.HTTP_400_BAD_REQUEST)
 
         # 2. Extract shipping address from frontend
@@ -34,98 +63,51 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not shipping_data:
             return Response({"error": "Shipping address is required"}, status=400)
 
-        # 3. Create Address
-        address = Address.objects.create(
-            full_address=shipping_data["full_address"],
-            city=shipping_data["city"],
-            state=shipping_data["state"],
-            zip_code=shipping_data["zip_code"],
-            country=shipping_data["country"],
-            phone_number=shipping_data["phone"],
-        )
-
-        # 4. Create Payment Info (initial state)
-        payment = PaymentInfo.objects.create(
-            payment_method=request.data.get("payment_method", "not_selected"),
-            payment_status="pending",
-        )
-
-        # 5. Create Order
-        order = Order.objects.create(
-            user=user,
-            order_number=f"ORD-{uuid.uuid4().hex[:10].upper()}",
-            total_amount=0,
-            shipping_address=address,
-            payment=payment,
-            order_status="pending_payment",
-        )
-
-        # 6. Group cart items by merchant
-        merchant_groups = {}
-        for item in cart.items.select_related("product"):
-            merchant = item.product.merchant
-
-            if merchant.id not in merchant_groups:
-                merchant_groups[merchant.id] = {
-                    "merchant": merchant,
-                    "items": []
-                }
-            merchant_groups[merchant.id]["items"].append(item)
-
-        # 7. Create SubOrders + Items
-        total_amount = 0
-
-        for m_id, group in merchant_groups.items():
-            merchant = group["merchant"]
-            items = group["items"]
-
-            sub_order = SubOrder.objects.create(
-                order=order,
-                merchant=merchant,
-                sub_order_number=f"SUB-{uuid.uuid4().hex[:10].upper()}",
-                status="pending",
-                subtotal=0,
+        # 3. Reserve stock and write the order, sub-orders and items in bulk
+        try:
+            order = place_order(
+                user,
+                lines,
+                shipping_data,
+                payment_method=request.data.get("payment_method", "not_selected"),
+            )
+        except StockShortfall as e:
+            return Response(
+                {"error": "Some items are out of stock", "shortfalls": e.shortfalls},
+                status=status.HTTP_409_CONFLICT
             )
 
-            subtotal = 0
-
-            for cart_item in items:
-                price = cart_item.get_unit_price
-                quantity = cart_item.quantity
-
-                primary_image = cart_item.product.images.filter(is_primary=True).first()
-                product_image_url = primary_image.image.url if primary_image else ""
-
-
-                OrderItem.objects.create(
-                    sub_order=sub_order,
-                    product=cart_item.product,
-                    product_name=cart_item.product.name,
-                    product_description=cart_item.product.description,
-                    product_image=product_image_url,
-                    price=price,
-                    quantity=quantity,
-                    item_total=price * quantity,
-                    # variant=None,
-                )
-
-                subtotal += price * quantity
-
-            sub_order.subtotal = subtotal
-            sub_order.save()
-
-            total_amount += subtotal
-
-        # 8. Update order total
-        order.total_amount = total_amount
-        order.save()
-
-        # 9. Clear cart
-        cart.items.all().delete()
+        # 4. Clear cart (and its stored summary)
+        cart.clear_cart()
 
         return Response({
             "message": "Order created successfully",
             "order_id": order.id,
             "order_number": order.order_number,
-            "total_amount": total_amount
+            "total_amount": order.total_amount
         }, status=201)
+
+    @action(detail=True, methods=["post"])
+    @transaction.atomic
+    def cancel(self, request, pk=None):
+        # lock the order so a payment confirmation cannot land mid-cancel
+        order = Order.objects.select_for_update().get(pk=self.get_object().pk)
+        if order.order_status != "pending_payment":
+            return Response(
+                {"error": f"Cannot cancel a {order.order_status} order."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sub_orders = list(order.sub_orders.exclude(status="cancelled").order_by("pk"))
+        if any(sub_order.status not in RELEASABLE_STATUSES for sub_order in sub_orders):
+            return Response(
+                {"error": "This order is already being fulfilled."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        for sub_order in sub_orders:
+            cancel_sub_order(sub_order)
+        order.order_status = "cancelled"
+        order.save(update_fields=["order_status", "updated_at"])
+
+        return Response({"message": "Order cancelled"}, status=status.HTTP_200_OK)
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.sales import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily merchant and product sales rollups from paid orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="YYYY-MM-DD; only rebuild days from this date on.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since must be a YYYY-MM-DD date")
+
+        merchants, products = rebuild_rollups(since=since, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {merchants} merchant-day and {products} product-day rollup row(s)"
+        ))
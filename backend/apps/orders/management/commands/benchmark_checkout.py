@@ -0,0 +1,107 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.carts.models import Cart, CartItem
+from apps.orders.api.shop.views import OrderViewSet
+from apps.products.models import Category, Product, ProductImage
+from apps.users.models import Merchant
+
+SHIPPING = {
+    "full_address": "1 Benchmark Street",
+    "city": "Lagos",
+    "state": "Lagos",
+    "zip_code": "100001",
+    "country": "NG",
+    "phone": "0000000000",
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time checkout for 1, 10 and 100 line carts and report queries per checkout. "
+        "Everything it creates is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, nargs='+', default=[1, 10, 100])
+        parser.add_argument('--merchants', type=int, default=3)
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for lines in options['lines']:
+            try:
+                with transaction.atomic():
+                    queries, timings = self._run(lines, options['merchants'], options['runs'])
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+            self.stdout.write(
+                f"{lines:>4} lines: {queries} queries, "
+                f"p50 {statistics.median(timings):.1f}ms, max {max(timings):.1f}ms"
+            )
+
+    def _run(self, lines, merchant_count, runs):
+        User = get_user_model()
+        category = Category.objects.create(name="benchmark-checkout")
+        merchants = [
+            Merchant.objects.create(
+                user=User.objects.create_user(email=f"bench-merchant-{i}@example.com", password=None),
+                store_name=f"Benchmark store {i}",
+            )
+            for i in range(merchant_count)
+        ]
+        products = Product.objects.bulk_create([
+            Product(
+                merchant=merchants[i % merchant_count],
+                category=category,
+                name=f"Benchmark product {i}",
+                description="",
+                original_price=Decimal("9.99"),
+                stock=runs * 10,
+            )
+            for i in range(lines)
+        ])
+        images = ProductImage.objects.bulk_create([
+            ProductImage(product=product, image="benchmark.jpg", is_primary=True)
+            for product in products
+        ])
+        # bulk_create skips ProductImage.save(), so point the products at them here
+        for product, image in zip(products, images):
+            product.primary_image = image
+        Product.objects.bulk_update(products, ["primary_image"])
+
+        buyer = User.objects.create_user(email="bench-buyer@example.com", password=None)
+        cart = Cart.objects.create(user=buyer)
+        view = OrderViewSet.as_view({'post': 'create'})
+        factory = APIRequestFactory()
+
+        queries, timings = None, []
+        for _ in range(runs):
+            CartItem.objects.bulk_create([
+                CartItem(cart=cart, product=product, quantity=1) for product in products
+            ])
+            request = factory.post('/api/orders/', {"shipping_address": SHIPPING}, format='json')
+            force_authenticate(request, user=buyer)
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = view(request)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            if response.status_code != 201:
+                raise RuntimeError(f"Checkout failed with {response.status_code}: {response.data}")
+            queries = len(captured)
+
+        return queries, timings
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.sales import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recount Merchant.total_sales and Product.sales_count from order items and report drift. Run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        drift = reconcile_counters(batch_size=options['batch_size'], fix=not options['dry_run'])
+
+        for row in drift:
+            self.stdout.write(f"{row.model} {row.pk}: stored {row.stored}, expected {row.expected}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Sales counters are consistent"))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} counter(s) drifted"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Fixed {len(drift)} drifted counter(s)"))
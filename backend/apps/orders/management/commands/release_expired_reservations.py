@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.services import RESERVATION_TIMEOUT, release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = "Cancel unpaid orders past the reservation timeout and return their stock. Run from cron."
+
+    def handle(self, *args, **options):
+        result = release_expired_reservations()
+        for order_number in result.skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Order {order_number} is unpaid but already being fulfilled; left for review"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Cancelled {result.cancelled} order(s) and released {result.released} sub-order "
+            f"reservation(s) older than {RESERVATION_TIMEOUT}"
+        ))
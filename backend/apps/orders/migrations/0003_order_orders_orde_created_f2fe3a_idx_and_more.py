@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-18 07:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_initial'),
+        ('users', '0002_merchant_merchant_pr_created_13a204_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created_at', '-id'], name='orders_orde_created_f2fe3a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='suborder',
+            index=models.Index(fields=['merchant', '-created_at', '-id'], name='orders_subo_merchan_ee6f7f_idx'),
+        ),
+    ]
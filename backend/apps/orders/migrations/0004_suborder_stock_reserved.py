@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_orders_orde_created_f2fe3a_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suborder',
+            name='stock_reserved',
+            field=models.BooleanField(default=False),
+        ),
+    ]
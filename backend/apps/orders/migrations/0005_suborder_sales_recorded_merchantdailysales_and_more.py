@@ -0,0 +1,50 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_suborder_stock_reserved'),
+        ('products', '0005_product_search_vector'),
+        ('users', '0003_merchant_rating_1_count_merchant_rating_2_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suborder',
+            name='sales_recorded',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='MerchantDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders_count', models.IntegerField(default=0)),
+                ('units_sold', models.IntegerField(default=0)),
+                ('merchant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='users.merchant')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('merchant', 'date'), name='unique_merchant_daily_sales')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductDailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('units_sold', models.IntegerField(default=0)),
+                ('merchant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_daily_sales', to='users.merchant')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['merchant', 'date'], name='orders_prod_merchan_baa4d4_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date'), name='unique_product_daily_sales')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_suborder_sales_recorded_merchantdailysales_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='suborder',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled'), ('refunded', 'Refunded')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:25
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_sales_dates(apps, schema_editor):
+    SubOrder = apps.get_model('orders', 'SubOrder')
+
+    # the day record_sales booked each counted sub-order on
+    days = defaultdict(list)
+    counted = SubOrder.objects.filter(sales_recorded=True).values_list('pk', 'order__paid_at', 'delivered_at')
+    for pk, paid_at, delivered_at in counted.iterator():
+        days[timezone.localdate(paid_at or delivered_at)].append(pk)
+    for day, pks in days.items():
+        SubOrder.objects.filter(pk__in=pks).update(sales_date=day)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_alter_suborder_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='suborder',
+            name='sales_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_sales_dates, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
 from .orders import (
     Address, Order, OrderItem, SubOrder, PaymentInfo
-)
\ No newline at end of file
+)
+from .rollups import MerchantDailySales, ProductDailySales
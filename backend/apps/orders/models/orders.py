@@ -78,6 +78,9 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+        ]
 
     def __str__(self):
         return f"Order {self.order_number}"
@@ -90,6 +93,7 @@ class SubOrder(models.Model):
         ('shipped', 'Shipped'),
         ('delivered', 'Delivered'),
         ('cancelled', 'Cancelled'),
+        ('refunded', 'Refunded'),
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -104,6 +108,13 @@ class SubOrder(models.Model):
     carrier = models.CharField(max_length=50, blank=True)
     estimated_delivery = models.DateField(null=True, blank=True)
 
+    # True while the items' stock is held for this sub-order (see orders/services.py)
+    stock_reserved = models.BooleanField(default=False)
+    # True while this sub-order is counted in the sales rollups (see orders/sales.py)
+    sales_recorded = models.BooleanField(default=False)
+    # the rollup day it was counted on, so a reversal hits the same day
+    sales_date = models.DateField(null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -112,6 +123,16 @@ class SubOrder(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['merchant', '-created_at', '-id']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so status transitions can be pushed to the buyer (orders/signals.py)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
 
     def __str__(self):
         return f"{self.order.order_status} SubOrder {self.sub_order_number} for Order {self.order.order_number}"
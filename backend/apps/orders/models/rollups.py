@@ -0,0 +1,44 @@
+from django.db import models
+
+
+class MerchantDailySales(models.Model):
+    """
+    Paid sales of one merchant on one day (the day the order was paid).
+    Maintained incrementally by apps/orders/sales.py; rebuilt by the
+    backfill_sales_rollups command.
+    """
+    merchant = models.ForeignKey("users.Merchant", on_delete=models.CASCADE, related_name='daily_sales')
+    date = models.DateField()
+
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders_count = models.IntegerField(default=0)
+    units_sold = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['merchant', 'date'], name='unique_merchant_daily_sales'),
+        ]
+
+    def __str__(self):
+        return f"{self.merchant_id} {self.date}: {self.revenue}"
+
+
+class ProductDailySales(models.Model):
+    """Paid sales of one product on one day, for top-product rankings."""
+    merchant = models.ForeignKey("users.Merchant", on_delete=models.CASCADE, related_name='product_daily_sales')
+    product = models.ForeignKey("products.Product", on_delete=models.CASCADE, related_name='daily_sales')
+    date = models.DateField()
+
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    units_sold = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='unique_product_daily_sales'),
+        ]
+        indexes = [
+            models.Index(fields=['merchant', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.date}: {self.units_sold}"
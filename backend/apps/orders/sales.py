@@ -0,0 +1,377 @@
+# orders/sales.py
+"""
+Sales bookkeeping for sub-orders.
+
+A sub-order counts as a sale once its order is paid or, for orders paid on
+delivery, once it is delivered. ``record_sales`` adds it to the daily
+rollups and to the ``Merchant.total_sales`` / ``Product.sales_count``
+counters, and ``reverse_sales`` takes it out again when it is cancelled or
+refunded. Both lock the sub-orders and flip ``sales_recorded`` in the same
+transaction, so each sub-order is counted at most once however the calls
+race. Counters move with F-expressions, never read-modify-write.
+
+The day a sale is counted on is stored in ``SubOrder.sales_date``, and a
+reversal is booked against that same day even if the order's dates change
+later. The rollups therefore always equal a recount of the sub-orders still flagged.
+``reconcile_counters`` recomputes the counters from the order items and
+reports any drift.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import (
+    Coalesce, Greatest, TruncDay, TruncMonth, TruncWeek,
+)
+from django.utils import timezone
+
+from apps.products.models import Product
+from apps.users.models import Merchant
+from .models import MerchantDailySales, OrderItem, ProductDailySales, SubOrder
+
+# sub-orders in these states are never counted
+REVERSED_STATUSES = ("cancelled", "refunded")
+
+
+def _lock(sub_orders, recorded):
+    return list(
+        SubOrder.objects.select_for_update()
+        .filter(pk__in=[sub_order.pk for sub_order in sub_orders], sales_recorded=recorded)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def _sale_day(paid_at, delivered_at):
+    # localdate(None) is today
+    return timezone.localdate(paid_at or delivered_at)
+
+
+def _stamp(sub_orders, batch_size=1000):
+    """Flags ``sub_orders`` as counted, each on the day it was sold. One UPDATE per day and batch."""
+    days = defaultdict(list)
+    rows = sub_orders.values_list("pk", "order__paid_at", "delivered_at")
+    for pk, paid_at, delivered_at in rows.iterator(chunk_size=batch_size):
+        days[_sale_day(paid_at, delivered_at)].append(pk)
+    for day, pks in days.items():
+        for start in range(0, len(pks), batch_size):
+            SubOrder.objects.filter(pk__in=pks[start:start + batch_size]).update(
+                sales_recorded=True, sales_date=day
+            )
+
+
+def _sale_lines(sub_order_ids):
+    """``(merchant, day, product, sub_order, quantity, total)`` for every item."""
+    return OrderItem.objects.filter(sub_order_id__in=sub_order_ids).values_list(
+        "sub_order__merchant_id",
+        "sub_order__sales_date",
+        "product_id",
+        "sub_order_id",
+        "quantity",
+        "item_total",
+    )
+
+
+def _increment(model, match, deltas):
+    """
+    Adds ``deltas[key] = {field: delta}`` onto the rows matching each key,
+    creating missing rows first. One INSERT and one UPDATE per table.
+    """
+    if not deltas:
+        return
+
+    model.objects.bulk_create(
+        [model(**match(key)) for key in deltas],
+        ignore_conflicts=True,
+    )
+
+    fields = next(iter(deltas.values())).keys()
+    conditions = [Q(**match(key)) for key in deltas]
+    condition = conditions[0]
+    for q in conditions[1:]:
+        condition |= q
+
+    model.objects.filter(condition).update(**{
+        field: Case(
+            *[When(Q(**match(key)), then=F(field) + delta[field]) for key, delta in deltas.items()],
+            default=F(field),
+        )
+        for field in fields
+    })
+
+
+def _bump(model, field, deltas):
+    """Adds ``deltas[pk]`` onto ``field`` of each row in one UPDATE, never below zero."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    model.objects.filter(pk__in=list(deltas)).update(**{
+        field: Greatest(
+            Case(
+                *[When(pk=pk, then=F(field) + delta) for pk, delta in deltas.items()],
+                default=F(field),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+    })
+
+
+def _apply(sub_order_ids, sign):
+    merchants = defaultdict(lambda: {"revenue": 0, "orders_count": 0, "units_sold": 0})
+    products = defaultdict(lambda: {"revenue": 0, "units_sold": 0})
+    counted = set()
+
+    for merchant_id, day, product_id, sub_order_id, quantity, total in _sale_lines(sub_order_ids):
+        merchant = merchants[(merchant_id, day)]
+        merchant["revenue"] += sign * total
+        merchant["units_sold"] += sign * quantity
+        if sub_order_id not in counted:
+            counted.add(sub_order_id)
+            merchant["orders_count"] += sign
+
+        # items whose product was deleted still count towards the merchant
+        if product_id is not None:
+            product = products[(merchant_id, product_id, day)]
+            product["revenue"] += sign * total
+            product["units_sold"] += sign * quantity
+
+    _increment(
+        MerchantDailySales,
+        lambda key: {"merchant_id": key[0], "date": key[1]},
+        merchants,
+    )
+    _increment(
+        ProductDailySales,
+        lambda key: {"merchant_id": key[0], "product_id": key[1], "date": key[2]},
+        products,
+    )
+
+    merchant_units = defaultdict(int)
+    for (merchant_id, _), merchant in merchants.items():
+        merchant_units[merchant_id] += merchant["units_sold"]
+    product_units = defaultdict(int)
+    for (_, product_id, _), product in products.items():
+        product_units[product_id] += product["units_sold"]
+
+    _bump(Merchant, "total_sales", merchant_units)
+    _bump(Product, "sales_count", product_units)
+
+
+@transaction.atomic
+def record_sales(sub_orders):
+    """Counts paid or delivered ``sub_orders`` not counted yet. Returns how many were."""
+    sub_order_ids = _lock(sub_orders, recorded=False)
+    if sub_order_ids:
+        _stamp(SubOrder.objects.filter(pk__in=sub_order_ids))
+        _apply(sub_order_ids, +1)
+    return len(sub_order_ids)
+
+
+@transaction.atomic
+def reverse_sales(sub_orders):
+    """
+    Takes counted ``sub_orders`` back out of the rollups, on the days they
+    were counted on. Returns how many were.
+    """
+    sub_order_ids = _lock(sub_orders, recorded=True)
+    if sub_order_ids:
+        _apply(sub_order_ids, -1)
+        SubOrder.objects.filter(pk__in=sub_order_ids).update(sales_recorded=False, sales_date=None)
+    return len(sub_order_ids)
+
+
+# --------------------------------------
+# Backfill
+# --------------------------------------
+
+def _sold(since=None):
+    """Sub-orders that have been sold, with the moment they were as ``sold_at``."""
+    sub_orders = SubOrder.objects.annotate(
+        sold_at=Coalesce("order__paid_at", "delivered_at")
+    ).filter(sold_at__isnull=False)
+    if since is not None:
+        sub_orders = sub_orders.filter(sold_at__date__gte=since)
+    return sub_orders
+
+
+def _counted_sub_orders(since=None):
+    return _sold(since).exclude(status__in=REVERSED_STATUSES)
+
+
+@transaction.atomic
+def rebuild_rollups(since=None, batch_size=1000):
+    """
+    Recomputes the rollups (from ``since`` on, or all of them) with two
+    grouped queries over the paid sub-orders, and re-flags which sub-orders
+    are counted. Returns ``(merchant_rows, product_rows)`` written.
+    """
+    merchant_rollups = MerchantDailySales.objects.all()
+    product_rollups = ProductDailySales.objects.all()
+    if since is not None:
+        merchant_rollups = merchant_rollups.filter(date__gte=since)
+        product_rollups = product_rollups.filter(date__gte=since)
+    merchant_rollups.delete()
+    product_rollups.delete()
+
+    counted = _counted_sub_orders(since)
+    SubOrder.objects.filter(
+        pk__in=_sold(since).filter(status__in=REVERSED_STATUSES).values("pk")
+    ).update(sales_recorded=False, sales_date=None)
+    _stamp(SubOrder.objects.filter(pk__in=counted.values("pk")), batch_size)
+
+    items = OrderItem.objects.filter(sub_order__in=counted.values("pk")).annotate(
+        date=F("sub_order__sales_date")
+    )
+
+    merchant_rows = (
+        items.values("sub_order__merchant_id", "date")
+        .annotate(
+            revenue=Sum("item_total"),
+            units_sold=Sum("quantity"),
+            orders_count=Count("sub_order_id", distinct=True),
+        )
+        .order_by()
+    )
+    merchants = _bulk_insert(MerchantDailySales, (
+        MerchantDailySales(
+            merchant_id=row["sub_order__merchant_id"],
+            date=row["date"],
+            revenue=row["revenue"],
+            units_sold=row["units_sold"],
+            orders_count=row["orders_count"],
+        )
+        for row in merchant_rows.iterator(chunk_size=batch_size)
+    ), batch_size)
+
+    product_rows = (
+        items.filter(product__isnull=False)
+        .values("sub_order__merchant_id", "product_id", "date")
+        .annotate(revenue=Sum("item_total"), units_sold=Sum("quantity"))
+        .order_by()
+    )
+    products = _bulk_insert(ProductDailySales, (
+        ProductDailySales(
+            merchant_id=row["sub_order__merchant_id"],
+            product_id=row["product_id"],
+            date=row["date"],
+            revenue=row["revenue"],
+            units_sold=row["units_sold"],
+        )
+        for row in product_rows.iterator(chunk_size=batch_size)
+    ), batch_size)
+
+    return merchants, products
+
+
+def _bulk_insert(model, rows, batch_size):
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+# --------------------------------------
+# Counter reconciliation
+# --------------------------------------
+
+@dataclass
+class Drift:
+    model: str
+    pk: object
+    stored: int
+    expected: int
+
+
+def _reconcile(model, field, group_by, batch_size, fix):
+    drift = []
+    last = None
+    while True:
+        with transaction.atomic():
+            rows = model.objects.order_by("pk")
+            if last is not None:
+                rows = rows.filter(pk__gt=last)
+            # locked so a sale recorded meanwhile lands after our recount
+            rows = list(rows.select_for_update().values_list("pk", field)[:batch_size])
+            if not rows:
+                return drift
+            last = rows[-1][0]
+
+            expected = dict(
+                OrderItem.objects.filter(
+                    sub_order__in=_counted_sub_orders().values("pk"),
+                    **{f"{group_by}__in": [pk for pk, _ in rows]},
+                )
+                .values(group_by)
+                .annotate(units=Sum("quantity"))
+                .order_by()
+                .values_list(group_by, "units")
+            )
+
+            stale = []
+            for pk, stored in rows:
+                units = expected.get(pk, 0)
+                if stored != units:
+                    drift.append(Drift(model.__name__, pk, stored, units))
+                    stale.append(model(pk=pk, **{field: units}))
+            if fix and stale:
+                model.objects.bulk_update(stale, [field])
+
+
+def reconcile_counters(batch_size=1000, fix=True):
+    """
+    Recounts ``Merchant.total_sales`` and ``Product.sales_count`` from the
+    order items of counted sub-orders, ``batch_size`` rows at a time.
+    Returns a ``Drift`` for every counter that was off; with ``fix`` they
+    are rewritten.
+    """
+    return (
+        _reconcile(Merchant, "total_sales", "sub_order__merchant_id", batch_size, fix)
+        + _reconcile(Product, "sales_count", "product_id", batch_size, fix)
+    )
+
+
+# --------------------------------------
+# Reading
+# --------------------------------------
+
+PERIODS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+def sales_series(merchant, since, period="day"):
+    """Revenue, orders and units per day/week/month from ``since``: one indexed query."""
+    trunc = PERIODS[period]
+    return list(
+        MerchantDailySales.objects.filter(merchant=merchant, date__gte=since)
+        .annotate(period=trunc("date"))
+        .values("period")
+        .annotate(
+            revenue=Sum("revenue"),
+            orders_count=Sum("orders_count"),
+            units_sold=Sum("units_sold"),
+        )
+        .order_by("period")
+    )
+
+
+def top_products(merchant, since, limit=10):
+    return list(
+        ProductDailySales.objects.filter(merchant=merchant, date__gte=since)
+        .values("product_id", "product__name")
+        .annotate(revenue=Sum("revenue"), units_sold=Sum("units_sold"))
+        .order_by("-revenue")[:limit]
+    )
@@ -0,0 +1,339 @@
+# orders/services.py
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+from django.utils import timezone
+
+from apps.notifications.events import publish_sub_order_status
+from apps.products.models import Product
+from integrations import redis as cache_tier
+from .models import Address, Order, OrderItem, PaymentInfo, SubOrder
+from .sales import REVERSED_STATUSES, record_sales, reverse_sales
+
+logger = logging.getLogger(__name__)
+
+# how long an unpaid order may hold its stock before it is cancelled
+RESERVATION_TIMEOUT = getattr(settings, "STOCK_RESERVATION_TIMEOUT", timedelta(minutes=30))
+# payment methods confirmed online through mark_order_paid; orders paid any
+# other way (cash on delivery, not chosen yet) never time out
+ONLINE_PAYMENT_METHODS = getattr(settings, "ONLINE_PAYMENT_METHODS", ("paystack",))
+# sub-orders an expired reservation may still cancel
+RELEASABLE_STATUSES = ("pending",)
+# a sub-order that got this far has been taken on by its merchant
+FULFILLED_STATUSES = ("processing", "shipped", "delivered")
+
+
+class StockShortfall(Exception):
+    """Raised when one or more cart lines cannot be covered by current stock."""
+
+    def __init__(self, shortfalls):
+        self.shortfalls = shortfalls
+        super().__init__(f"Insufficient stock for {len(shortfalls)} product(s)")
+
+
+def _quantities(lines):
+    quantities = defaultdict(int)
+    for product_id, quantity in lines:
+        quantities[product_id] += quantity
+    return quantities
+
+
+def _apply_stock_delta(quantities, sign):
+    """One UPDATE for every product: stock = stock +/- qty per row."""
+    Product.objects.filter(pk__in=quantities.keys()).update(
+        stock=Case(
+            *[When(pk=pk, then=F("stock") + sign * qty) for pk, qty in quantities.items()],
+            default=F("stock"),
+            output_field=IntegerField(),
+        )
+    )
+
+    # queryset updates skip the model signals, drop the cached details here
+    def invalidate():
+        for pk in quantities:
+            cache_tier.invalidate(cache_tier.PRODUCTS, "detail", pk)
+
+    transaction.on_commit(invalidate)
+
+
+@transaction.atomic
+def reserve_stock(lines):
+    """
+    Decrements stock for every ``(product_id, quantity)`` line or for none.
+
+    The product rows are locked with ``SELECT ... FOR UPDATE`` in primary key
+    order, so two checkouts sharing products always lock them in the same
+    order and cannot deadlock. Stock is checked under the lock and taken with
+    a single UPDATE. If any line is short nothing is written and
+    ``StockShortfall`` lists every short line, not just the first.
+    """
+    quantities = _quantities(lines)
+    locked = (
+        Product.objects.select_for_update()
+        .filter(pk__in=quantities.keys())
+        .order_by("pk")
+        .values_list("pk", "stock", "is_active")
+    )
+
+    available = {pk: (stock if is_active else 0) for pk, stock, is_active in locked}
+    shortfalls = [
+        {
+            "product_id": pk,
+            "requested": qty,
+            "available": available.get(pk, 0),
+        }
+        for pk, qty in sorted(quantities.items())
+        if available.get(pk, 0) < qty
+    ]
+    if shortfalls:
+        raise StockShortfall(shortfalls)
+
+    _apply_stock_delta(quantities, -1)
+
+
+@transaction.atomic
+def release_stock(sub_orders):
+    """
+    Returns the reserved stock of ``sub_orders`` to their products.
+
+    Sub-orders are locked and their ``stock_reserved`` flag is cleared in
+    the same transaction, so a reservation is released at most once even
+    if cancellation and the payment-timeout job race each other.
+    """
+    sub_order_ids = list(
+        SubOrder.objects.select_for_update()
+        .filter(pk__in=[sub_order.pk for sub_order in sub_orders], stock_reserved=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    if not sub_order_ids:
+        return 0
+
+    SubOrder.objects.filter(pk__in=sub_order_ids).update(stock_reserved=False)
+
+    quantities = dict(
+        OrderItem.objects.filter(sub_order_id__in=sub_order_ids, product__isnull=False)
+        .values_list("product_id")
+        .annotate(quantity=Sum("quantity"))
+        .order_by("product_id")
+    )
+    if quantities:
+        # lock in the same pk order reserve_stock uses
+        list(
+            Product.objects.select_for_update()
+            .filter(pk__in=quantities.keys())
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        _apply_stock_delta(quantities, +1)
+
+    return len(sub_order_ids)
+
+
+@transaction.atomic
+def cancel_sub_order(sub_order):
+    sub_order.status = "cancelled"
+    sub_order.save(update_fields=["status", "updated_at"])
+    release_stock([sub_order])
+    reverse_sales([sub_order])
+
+
+@transaction.atomic
+def mark_order_paid(order, transaction_id=""):
+    """
+    Records a successful payment: the order and its payment move to paid,
+    the stock stays taken, and the sub-orders are counted as sales.
+    Calling it again for a paid order does nothing.
+    """
+    order = Order.objects.select_for_update().get(pk=order.pk)
+    if order.paid_at is not None:
+        return order
+
+    order.order_status = "paid"
+    order.paid_at = timezone.now()
+    order.save(update_fields=["order_status", "paid_at", "updated_at"])
+    if order.payment_id:
+        PaymentInfo.objects.filter(pk=order.payment_id).update(
+            payment_status="paid", transaction_id=transaction_id
+        )
+
+    record_sales(list(order.sub_orders.exclude(status__in=REVERSED_STATUSES)))
+    return order
+
+
+@transaction.atomic
+def mark_sub_order_delivered(sub_order):
+    """
+    Delivers a sub-order. Orders paid on delivery become sales here; for
+    orders paid up front this is a no-op on the counters.
+    """
+    sub_order.status = "delivered"
+    sub_order.delivered_at = timezone.now()
+    sub_order.save(update_fields=["status", "delivered_at", "updated_at"])
+    record_sales([sub_order])
+
+
+@transaction.atomic
+def refund_sub_order(sub_order):
+    """Refunds a sold sub-order and takes it back out of the sales figures."""
+    sub_order.status = "refunded"
+    sub_order.save(update_fields=["status", "updated_at"])
+    reverse_sales([sub_order])
+
+
+@dataclass
+class ExpiredReservations:
+    released: int = 0
+    cancelled: int = 0
+    # order numbers left alone because a merchant is already fulfilling them
+    skipped: list = field(default_factory=list)
+
+
+def release_expired_reservations(now=None):
+    """
+    Cancels unpaid online-payment orders older than the reservation timeout.
+
+    Only orders paid through one of ``ONLINE_PAYMENT_METHODS`` can expire,
+    the others are never confirmed by ``mark_order_paid``. Sub-orders still
+    pending are cancelled: their stock goes back on the shelf and any sales
+    they were counted in are reversed. An order with a sub-order already
+    processing, shipped or delivered is skipped and logged instead.
+    """
+    cutoff = (now or timezone.now()) - RESERVATION_TIMEOUT
+    expired = Order.objects.filter(
+        order_status="pending_payment",
+        payment__payment_method__in=ONLINE_PAYMENT_METHODS,
+        created_at__lt=cutoff,
+    )
+
+    result = ExpiredReservations()
+    for order_id in expired.values_list("pk", flat=True).iterator():
+        with transaction.atomic():
+            # re-check under the lock, the order may have been paid meanwhile
+            order = (
+                Order.objects.select_for_update()
+                .filter(pk=order_id, order_status="pending_payment")
+                .first()
+            )
+            if order is None:
+                continue
+
+            sub_orders = list(order.sub_orders.select_for_update().order_by("pk"))
+            if any(sub_order.status in FULFILLED_STATUSES for sub_order in sub_orders):
+                result.skipped.append(order.order_number)
+                logger.warning(f"Expired order {order.order_number} is being fulfilled, not cancelling it")
+                continue
+
+            releasable = [sub_order for sub_order in sub_orders if sub_order.status in RELEASABLE_STATUSES]
+            result.released += release_stock(releasable)
+            reverse_sales(releasable)
+            SubOrder.objects.filter(pk__in=[sub_order.pk for sub_order in releasable]).update(status="cancelled")
+
+            # queryset updates skip the signals, tell the buyer here
+            for sub_order in releasable:
+                sub_order.status = "cancelled"
+                publish_sub_order_status(order.user_id, sub_order)
+            order.order_status = "cancelled"
+            order.save(update_fields=["order_status", "updated_at"])
+            result.cancelled += 1
+        logger.info(f"Released stock for expired order {order.order_number}")
+
+    return result
+
+
+# --------------------------------------
+# Checkout pipeline
+# --------------------------------------
+
+def load_checkout_lines(cart):
+    """
+    Stage 1: every cart line with its product, merchant and primary image,
+    in one query however many lines there are.
+    """
+    return list(cart.items.select_related("product__merchant", "product__primary_image"))
+
+
+def _number(prefix):
+    return f"{prefix}-{uuid.uuid4().hex[:10].upper()}"
+
+
+@transaction.atomic
+def place_order(user, lines, shipping_data, payment_method="not_selected"):
+    """
+    Turns loaded cart lines into an order.
+
+    Stock is reserved first, then sub-orders, items and totals are built in
+    memory and written with one ``bulk_create`` per table. The number of
+    queries is the same for a 1-line and a 100-line cart.
+    Raises ``StockShortfall`` before anything is written.
+    """
+    # Stage 2: reserve stock for every line, nothing is written if any line is short
+    reserve_stock([(line.product_id, line.quantity) for line in lines])
+
+    # Stage 3: group by merchant and total in memory
+    groups = {}
+    for line in lines:
+        groups.setdefault(line.product.merchant_id, []).append(line)
+
+    address = Address.objects.create(
+        full_address=shipping_data["full_address"],
+        city=shipping_data["city"],
+        state=shipping_data["state"],
+        zip_code=shipping_data["zip_code"],
+        country=shipping_data["country"],
+        phone_number=shipping_data["phone"],
+    )
+    payment = PaymentInfo.objects.create(
+        payment_method=payment_method,
+        payment_status="pending",
+    )
+    order = Order(
+        user=user,
+        order_number=_number("ORD"),
+        total_amount=0,
+        shipping_address=address,
+        payment=payment,
+        order_status="pending_payment",
+    )
+
+    sub_orders, order_items = [], []
+    for merchant_id, merchant_lines in groups.items():
+        sub_order = SubOrder(
+            order=order,
+            merchant_id=merchant_id,
+            sub_order_number=_number("SUB"),
+            status="pending",
+            subtotal=0,
+            stock_reserved=True,
+        )
+        for line in merchant_lines:
+            product = line.product
+            price = line.get_unit_price
+            item_total = price * line.quantity
+
+            order_items.append(OrderItem(
+                sub_order=sub_order,
+                product=product,
+                product_name=product.name,
+                product_description=product.description,
+                product_image=product.primary_image_url,
+                price=price,
+                quantity=line.quantity,
+                item_total=item_total,
+            ))
+            sub_order.subtotal += item_total
+        sub_orders.append(sub_order)
+        order.total_amount += sub_order.subtotal
+
+    # Stage 4: one insert per table
+    order.save()
+    SubOrder.objects.bulk_create(sub_orders)
+    OrderItem.objects.bulk_create(order_items)
+
+    return order
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.notifications.events import publish_sub_order_status
+from apps.orders.models import Order, SubOrder
+
+
+@receiver(post_save, sender=SubOrder)
+def sub_order_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
+    if created or previous == instance.status:
+        return
+
+    user_id = Order.objects.filter(pk=instance.order_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        publish_sub_order_status(user_id, instance)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.orders.models import MerchantDailySales, SubOrder
+from apps.orders.sales import record_sales
+from apps.orders.services import (
+    load_checkout_lines, mark_order_paid, mark_sub_order_delivered, place_order,
+)
+from common.testing import SHIPPING, make_cart, make_merchant, make_product, make_user
+
+
+class RefundOrderViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.merchant = make_merchant()
+        self.product = make_product(self.merchant)
+        buyer = make_user()
+        order = place_order(buyer, load_checkout_lines(make_cart(buyer, {self.product: 2})), SHIPPING)
+        self.sub_order = order.sub_orders.get()
+        self.client.force_authenticate(self.merchant.user)
+
+    def refund(self, sub_order_id):
+        return self.client.post(reverse("merchant-order-refund", args=[sub_order_id]))
+
+    def test_refunds_a_delivered_sub_order(self):
+        mark_sub_order_delivered(self.sub_order)
+
+        response = self.refund(self.sub_order.pk)
+
+        self.assertEqual(response.status_code, 200)
+        self.sub_order.refresh_from_db()
+        self.assertEqual(self.sub_order.status, "refunded")
+        self.assertFalse(self.sub_order.sales_recorded)
+
+    def test_other_merchants_sub_orders_are_not_found(self):
+        mark_sub_order_delivered(self.sub_order)
+        self.client.force_authenticate(make_merchant().user)
+
+        response = self.refund(self.sub_order.pk)
+
+        self.assertEqual(response.status_code, 404)
+        self.sub_order.refresh_from_db()
+        self.assertEqual(self.sub_order.status, "delivered")
+
+    def test_unknown_sub_order_is_not_found(self):
+        self.assertEqual(self.refund("00000000-0000-0000-0000-000000000000").status_code, 404)
+
+    def test_pending_sub_order_cannot_be_refunded(self):
+        response = self.refund(self.sub_order.pk)
+
+        self.assertEqual(response.status_code, 400)
+        self.sub_order.refresh_from_db()
+        self.assertEqual(self.sub_order.status, "pending")
+
+
+class SalesReversalTests(APITestCase):
+    def test_reversal_hits_the_day_the_sale_was_counted_on(self):
+        merchant = make_merchant()
+        product = make_product(merchant)
+        buyer = make_user()
+        order = place_order(buyer, load_checkout_lines(make_cart(buyer, {product: 2})), SHIPPING)
+        sub_order = order.sub_orders.get()
+
+        # paid on delivery three days ago, so counted on that day ...
+        delivered_at = timezone.now() - timedelta(days=3)
+        SubOrder.objects.filter(pk=sub_order.pk).update(status="delivered", delivered_at=delivered_at)
+        record_sales([sub_order])
+        # ... and the payment is only captured today
+        mark_order_paid(order)
+
+        self.client.force_authenticate(merchant.user)
+        self.client.post(reverse("merchant-order-refund", args=[sub_order.pk]))
+
+        rows = MerchantDailySales.objects.values_list("date", "units_sold", "orders_count")
+        self.assertEqual(list(rows), [(timezone.localdate(delivered_at), 0, 0)])
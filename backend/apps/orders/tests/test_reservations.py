@@ -0,0 +1,135 @@
+import threading
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from apps.orders.models import Order, OrderItem
+from apps.orders.sales import record_sales
+from apps.orders.services import (
+    RESERVATION_TIMEOUT, StockShortfall, load_checkout_lines, place_order, release_expired_reservations,
+)
+from common.testing import SHIPPING, make_cart, make_merchant, make_product, make_user
+
+
+def checkout(quantities, payment_method="paystack"):
+    buyer = make_user()
+    return place_order(
+        buyer, load_checkout_lines(make_cart(buyer, quantities)), SHIPPING, payment_method=payment_method
+    )
+
+
+class ReleaseExpiredReservationsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = make_product(make_merchant(), stock=10)
+        self.other = make_product(make_merchant(), stock=10)
+        self.after_timeout = timezone.now() + RESERVATION_TIMEOUT + timedelta(minutes=1)
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock
+
+    def test_cancels_pending_sub_orders_and_returns_their_stock(self):
+        order = checkout({self.product: 3})
+
+        result = release_expired_reservations(now=self.after_timeout)
+
+        self.assertEqual((result.cancelled, result.released, result.skipped), (1, 1, []))
+        order.refresh_from_db()
+        self.assertEqual(order.order_status, "cancelled")
+        self.assertEqual(list(order.sub_orders.values_list("status", flat=True)), ["cancelled"])
+        self.assertEqual(self.stock(self.product), 10)
+
+    def test_skips_orders_already_being_fulfilled(self):
+        for status in ("processing", "shipped", "delivered"):
+            with self.subTest(status):
+                order = checkout({self.product: 1, self.other: 2})
+                shipped = order.sub_orders.get(merchant=self.product.merchant)
+                shipped.status = status
+                shipped.save()
+
+                result = release_expired_reservations(now=self.after_timeout)
+
+                self.assertEqual(result.skipped, [order.order_number])
+                order.refresh_from_db()
+                self.assertEqual(order.order_status, "pending_payment")
+                self.assertEqual(
+                    sorted(order.sub_orders.values_list("status", flat=True)), sorted([status, "pending"])
+                )
+                order.delete()
+
+    def test_leaves_orders_not_paid_online_alone(self):
+        for payment_method in ("cash_on_delivery", "not_selected"):
+            with self.subTest(payment_method):
+                order = checkout({self.product: 1}, payment_method=payment_method)
+
+                result = release_expired_reservations(now=self.after_timeout)
+
+                self.assertEqual(result.cancelled, 0)
+                order.refresh_from_db()
+                self.assertEqual(order.order_status, "pending_payment")
+                self.assertEqual(order.sub_orders.get().status, "pending")
+
+    def test_reverses_sales_counted_on_released_sub_orders(self):
+        order = checkout({self.product: 2})
+        record_sales(list(order.sub_orders.all()))
+
+        release_expired_reservations(now=self.after_timeout)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.sales_count, 0)
+        self.assertFalse(order.sub_orders.get().sales_recorded)
+
+    def test_leaves_recent_orders_alone(self):
+        order = checkout({self.product: 1})
+
+        result = release_expired_reservations()
+
+        self.assertEqual(result.cancelled, 0)
+        order.refresh_from_db()
+        self.assertEqual(order.order_status, "pending_payment")
+
+
+class HotProductCheckoutTests(TransactionTestCase):
+    """Many buyers racing for the last units of one product."""
+
+    STOCK = 5
+    BUYERS = 20
+
+    def test_never_sells_more_than_the_stock(self):
+        product = make_product(make_merchant(), stock=self.STOCK)
+        carts = []
+        for _ in range(self.BUYERS):
+            buyer = make_user()
+            carts.append((buyer, make_cart(buyer, {product: 1})))
+
+        start = threading.Barrier(self.BUYERS)
+        placed, short, failures = [], [], []
+
+        def buy(buyer, cart):
+            try:
+                lines = load_checkout_lines(cart)
+                start.wait()
+                placed.append(place_order(buyer, lines, SHIPPING))
+            except StockShortfall:
+                short.append(buyer)
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=buy, args=cart) for cart in carts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        self.assertEqual((len(placed), len(short)), (self.STOCK, self.BUYERS - self.STOCK))
+        product.refresh_from_db()
+        self.assertEqual(product.stock, 0)
+        self.assertEqual(OrderItem.objects.filter(product=product).count(), self.STOCK)
+        self.assertEqual(Order.objects.count(), self.STOCK)
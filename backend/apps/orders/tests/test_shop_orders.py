@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.orders.models import Order
+from apps.orders.services import load_checkout_lines, place_order
+from common.testing import SHIPPING, make_cart, make_merchant, make_product, make_user
+
+
+class ShopOrderViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = make_product(make_merchant(), stock=10)
+        self.buyer = make_user()
+        self.order = place_order(
+            self.buyer, load_checkout_lines(make_cart(self.buyer, {self.product: 3})), SHIPPING
+        )
+        self.client.force_authenticate(self.buyer)
+
+    def test_orders_cannot_be_edited_or_deleted(self):
+        url = reverse("orders-detail", args=[self.order.pk])
+        for method in ("put", "patch", "delete"):
+            with self.subTest(method):
+                response = getattr(self.client, method)(url, {}, format="json")
+
+                self.assertEqual(response.status_code, 405)
+        self.assertTrue(Order.objects.filter(pk=self.order.pk).exists())
+
+    def test_cancel_releases_the_reserved_stock(self):
+        response = self.client.post(reverse("orders-cancel", args=[self.order.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.order_status, "cancelled")
+        self.assertEqual(self.order.sub_orders.get().status, "cancelled")
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 10)
+
+    def test_cannot_cancel_an_order_being_fulfilled(self):
+        self.order.sub_orders.update(status="shipped")
+
+        response = self.client.post(reverse("orders-cancel", args=[self.order.pk]))
+
+        self.assertEqual(response.status_code, 400)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 7)
+
+    def test_other_buyers_orders_are_not_found(self):
+        self.client.force_authenticate(make_user())
+
+        response = self.client.post(reverse("orders-cancel", args=[self.order.pk]))
+
+        self.assertEqual(response.status_code, 404)
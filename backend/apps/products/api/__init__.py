@@ -7,7 +7,9 @@ from .shop.serializers.products_serializers import (
     ProductInventorySerializer,
     ProductCategorySerializer,
     WishlistSerializer, 
+    WishlistItemSerializer,
     ProductSerializer,
+    ProductCardSerializer,
     ReviewSerializer,
 
     CategorySerializer
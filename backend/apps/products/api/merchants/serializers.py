@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from products.models import Product, ProductInventory, Category, ProductSpecification, Feature, ProductImage
+from apps.products.models import Product, ProductInventory, Category, ProductSpecification, Feature, ProductImage
 
 class ProductCreateSerializer(serializers.ModelSerializer):
     category_id = serializers.PrimaryKeyRelatedField(
@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from ..merchants.views.views import ProductViewSet
-from ..merchants.views.views import (
+from .views import ProductViewSet
+from .views import (
     ProductInventoryView,
     ProductFeatureView,
     ProductImagesViewSet,
@@ -11,7 +11,7 @@ from ..merchants.views.views import (
 )
 
 router = DefaultRouter()
-router.register(r"products", ProductViewSet, basename="products")
+router.register(r"products", ProductViewSet, basename="merchant-products")
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,6 +1,6 @@
 from rest_framework import viewsets, generics
-from products.models import Product, Category
-from products.api import (
+from apps.products.models import Product, Category
+from apps.products.api import (
     ProductCategorySerializer,
     ProductSerializer,
     
@@ -12,15 +12,18 @@ from .serializers import (
     ProductInventoryWriteSerializer, 
     ProductSpecificationWriteSerializer
 )
-from products.models import ProductSpecification, ProductImage
+from apps.products.models import ProductSpecification, ProductImage
+from apps.products import bulk
 
-# from ..config.permissions import IsMerchantUser, IsActiveVerifiedMerchant
+from common.permissions import IsMerchantUser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from django.http import StreamingHttpResponse
 
 from rest_framework import viewsets, generics
 from rest_framework.permissions import AllowAny
@@ -29,13 +32,15 @@ class CategoryListView(generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = ProductCategorySerializer
     permission_classes = [AllowAny]
+    # merchants pick from the full list when creating a product
+    pagination_class = None
 
     
 class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     permission_classes = [
         IsAuthenticated, 
-        # IsMerchantUser, 
+        IsMerchantUser, 
         # IsActiveVerifiedMerchant
     ]
     
@@ -47,12 +52,75 @@ class ProductViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Product.objects.filter(merchant=self.request.user.merchant)
 
+    # POST /products/import/ (multipart: file, format=csv|jsonl, dry_run)
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_products(self, request):
+        """
+        Creates products from an uploaded CSV or JSON Lines file, read as a
+        stream and written in batches. Responds with the per-row report.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "This field is required."})
+        fmt = request.data.get("format") or ("jsonl" if upload.name.endswith(".jsonl") else "csv")
+        if fmt not in bulk.FORMATS:
+            raise ValidationError({"format": f"Must be one of {', '.join(bulk.FORMATS)}"})
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true")
+
+        report = bulk.import_products(
+            request.user.merchant,
+            bulk.read_rows(bulk.text_stream(upload.file), fmt),
+            dry_run=dry_run,
+        )
+        return Response(
+            report.as_dict(),
+            status=status.HTTP_200_OK if dry_run or not report.created else status.HTTP_201_CREATED,
+        )
+
+    # PATCH /products/bulk/ [{"id": ..., "stock": 5, "sale_price": "9.99"}, ...]
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        Changes price, sale, stock and active flags on many of the merchant's
+        products at once, in batches with one UPDATE each. Rows that fail are
+        reported by their position and skipped; the rest are applied.
+        """
+        rows = request.data
+        if not isinstance(rows, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of product changes."]})
+        if len(rows) > bulk.UPDATE_LIMIT:
+            raise ValidationError({"non_field_errors": [f"At most {bulk.UPDATE_LIMIT} rows per request."]})
+
+        report = bulk.update_products(request.user.merchant, enumerate(rows))
+        return Response(report.as_dict())
+
+    # GET /products/export/?type=csv|jsonl
+    # (not ?format=, which DRF keeps for picking a renderer)
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Streams the merchant's catalog in the format the import reads."""
+        fmt = request.query_params.get("type", "csv")
+        if fmt not in bulk.FORMATS:
+            raise ValidationError({"type": f"Must be one of {', '.join(bulk.FORMATS)}"})
+
+        response = StreamingHttpResponse(
+            bulk.export_products(request.user.merchant, fmt),
+            content_type="text/csv" if fmt == "csv" else "application/x-ndjson",
+        )
+        response["Content-Disposition"] = f'attachment; filename="products.{fmt}"'
+        return response
+
+
+def get_merchant_product(request, pk):
+    """The product ``pk`` if it belongs to the requesting merchant, 404 otherwise."""
+    return get_object_or_404(Product, pk=pk, merchant=request.user.merchant)
+
 
 class ProductInventoryView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsMerchantUser]
 
     def patch(self, request, pk):
-        product = get_object_or_404(Product, pk=pk)
+        product = get_merchant_product(request, pk)
 
         serializer = ProductInventoryWriteSerializer(
             data=request.data,
@@ -68,11 +136,11 @@ class ProductInventoryView(APIView):
 
 
 class ProductSpecificationView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsMerchantUser]
     
     def post(self, request, pk):
         """Create a new specification for a product"""
-        product = get_object_or_404(Product, pk=pk)
+        product = get_merchant_product(request, pk)
         serializer = ProductSpecificationWriteSerializer(data=request.data)
         
         if serializer.is_valid():
@@ -83,7 +151,7 @@ class ProductSpecificationView(APIView):
     
     def delete(self, request, product_pk, spec_pk):
         """Delete a specific specification for a product"""
-        product = get_object_or_404(Product, pk=product_pk)
+        product = get_merchant_product(request, product_pk)
         specification = get_object_or_404(
             ProductSpecification,
             pk=spec_pk,
@@ -94,10 +162,10 @@ class ProductSpecificationView(APIView):
 
 
 class ProductFeatureView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, IsMerchantUser]
 
     def post(self, request, pk):
-        product = get_object_or_404(Product, pk=pk)
+        product = get_merchant_product(request, pk)
         serializer = ProductFeatureWriteSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save(product=product)
@@ -109,7 +177,7 @@ class ProductFeatureView(APIView):
 
 
     def delete(self, request, product_pk, feature_pk):
-        product = get_object_or_404(Product, id=product_pk)
+        product = get_merchant_product(request, product_pk)
         feature = get_object_or_404(product.features, id=feature_pk)
         feature.delete()
         return Response({"message": "Feature deleted successfully"}, status=204)
@@ -118,17 +186,18 @@ class ProductFeatureView(APIView):
 class ProductImagesViewSet(viewsets.ViewSet):
     from rest_framework.parsers import MultiPartParser, FormParser
     parser_classes = (MultiPartParser, FormParser)
+    permission_classes = [permissions.IsAuthenticated, IsMerchantUser]
 
     # GET /products/<product_id>/images/
     def list(self, request, product_id=None):
-        product = get_object_or_404(Product, id=product_id)
+        product = get_merchant_product(request, product_id)
         images = product.images.all()
         serializer = ProductImageWriteSerializer(images, many=True)
         return Response(serializer.data)
 
     # POST /products/<product_id>/images/
     def create(self, request, product_id=None):
-        product = get_object_or_404(Product, id=product_id)
+        product = get_merchant_product(request, product_id)
 
         file = request.FILES.get("image")
         if not file:
@@ -140,7 +209,7 @@ class ProductImagesViewSet(viewsets.ViewSet):
 
     # DELETE /products/<product_id>/images/<image_id>/
     def destroy(self, request, product_id=None, pk=None):
-        product = get_object_or_404(Product, id=product_id)
+        product = get_merchant_product(request, product_id)
         image = get_object_or_404(ProductImage, id=pk, product=product)
 
         image.delete()
@@ -149,12 +218,10 @@ class ProductImagesViewSet(viewsets.ViewSet):
     # POST /products/<product_id>/images/<image_id>/set-primary/
     @action(detail=True, methods=["post"])
     def set_primary(self, request, product_id=None, pk=None):
-        product = get_object_or_404(Product, id=product_id)
+        product = get_merchant_product(request, product_id)
         image = get_object_or_404(ProductImage, id=pk, product=product)
 
-        # remove primary from all images first
-        product.images.update(is_primary=False)
-
+        # save() unsets the previous primary image and repoints the product
         image.is_primary = True
         image.save()
 
@@ -3,6 +3,8 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from ..views.products_views import(
     add_or_remove_to_wishlist,
+    wishlisted_products,
+    WishlistListView,
     ProductReviewCreateView,
     ShopProductViewSet,
 ) 
@@ -11,6 +13,8 @@ router.register(r"", ShopProductViewSet, basename="products")
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('products/wishlist/', WishlistListView.as_view(), name='wishlist'),
+    path('products/wishlisted/', wishlisted_products, name='products-wishlisted'),
     path(
         'products/<uuid:product_id>/wishlist/', 
         add_or_remove_to_wishlist, 
@@ -11,7 +11,8 @@ from apps.products.models import(
     ProductInventory, 
     Feature
 )
-from django.db.models import Avg
+from apps.users.models import Merchant
+from common.fieldsets import SparseFieldsMixin
 
 class ProductMerchantSerializer(serializers.ModelSerializer):
     store_logo = serializers.SerializerMethodField()
@@ -19,9 +20,9 @@ class ProductMerchantSerializer(serializers.ModelSerializer):
 
 
     class Meta:
-        model = Product
+        model = Merchant
         fields = [
-            "id", "store_name", "average_rating", "products",
+            "id", "store_name", "average_rating", "rating_count",
             "store_logo", "store_phone", "active_status", "verification_status",
              "total_sales", "created_at"
         ]
@@ -33,10 +34,7 @@ class ProductMerchantSerializer(serializers.ModelSerializer):
 
     
     def get_average_rating(self, obj):
-        avg = obj.merchant_reviews.aggregate(avg=Avg('rating'))['avg']
-
-
-        return round(avg, 1) if avg is not None else 0.0
+        return round(obj.rating_avg, 1)
 
 
 class WishlistSerializer(ModelSerializer):
@@ -86,7 +84,7 @@ class ProductImageSerializer(ModelSerializer):
             return obj.image.url
         return None 
 
-class ProductSerializer(ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, ModelSerializer):
     merchant = ProductMerchantSerializer(read_only=True)
     images = ProductImageSerializer(many=True, read_only=False)
     category = ProductCategorySerializer(read_only=True)
@@ -98,27 +96,60 @@ class ProductSerializer(ModelSerializer):
     
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description',  'stock', "average_rating", 'is_on_sale', 'created_at',
+        fields = ['id', 'name', 'description',  'stock', "average_rating", "rating_count", 'is_on_sale', 'created_at',
                   'sale_price', 'original_price', 'category',
                     'inventory', 'features', "is_active", 'images', 'merchant', 'product_reviews', 'specifications']
+        # loaded only when listed in ?fields= or ?expand= (see Product.objects.for_catalog)
+        expandable_fields = ['category', 'inventory', 'features', 'images', 'merchant',
+                             'product_reviews', 'specifications']
 
     def get_average_rating(self, obj):
-        avg = obj.product_reviews.aggregate(avg=Avg('rating'))['avg']
-        return round(avg, 1) if avg is not None else 0.0
+        return round(obj.rating_avg, 1)
 
 
 
+class ProductCardSerializer(ModelSerializer):
+    """
+    What a product tile needs. Expects ``Product.objects.for_cards()``;
+    nothing here touches the database per product.
+    """
+    price = serializers.DecimalField(source='effective_price', max_digits=10, decimal_places=2, read_only=True)
+    image = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+    in_stock = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'price', 'original_price', 'is_on_sale', 'image',
+                  'average_rating', 'rating_count', 'in_stock']
+
+    def get_image(self, obj):
+        return obj.primary_image_url or None
+
+    def get_average_rating(self, obj):
+        return round(obj.rating_avg, 1)
+
+    def get_in_stock(self, obj):
+        return obj.stock > 0
+
+
+class WishlistItemSerializer(ModelSerializer):
+    """A wishlist row with its product as a card. Expects ``wishlist.items()``."""
+    product = ProductCardSerializer(read_only=True)
+
+    class Meta:
+        model = Wishlist
+        fields = ['id', 'product', 'created_at']
+
+
 class CategorySerializer(ModelSerializer):
-    product_count = serializers.SerializerMethodField()
-    products = ProductSerializer(many=True, read_only=True)
+    """Category with its product count. Expects ``product_count`` annotated."""
+    product_count = serializers.IntegerField(read_only=True)
     image = serializers.SerializerMethodField()
 
     class Meta:
         model = Category
-        fields = ['id', 'name', 'image', 'product_count', 'products']
-
-    def get_product_count(self, obj):
-        return obj.products.count()
+        fields = ['id', 'name', 'image', 'product_count']
 
     def get_image(self, obj):
         """This method MUST be named get_<field_name>"""
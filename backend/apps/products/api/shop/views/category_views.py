@@ -1,15 +1,94 @@
-from apps.products.api import CategorySerializer
+from apps.products.api import CategorySerializer, ProductCardSerializer
 from rest_framework.permissions import AllowAny
 from rest_framework import viewsets, generics
-from apps.products.models import Category
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from urllib.parse import parse_qs, urlsplit
+from django.db.models import Count
+from apps.products.models import Category, Product
+from common.pagination import CategoryCursorPagination, ProductCursorPagination
+from integrations import redis as cache_tier
+from apps.products.viewer import add_viewer_state, wants_viewer_state
+from common.authentication import OptionalJWTAuthentication
+
+
+def categories_with_counts():
+    # one grouped query instead of a COUNT per category
+    return Category.objects.annotate(product_count=Count("products"))
+
 
 class CategoryListView(generics.ListAPIView):
-    queryset = Category.objects.all()
     serializer_class = CategorySerializer
     authentication_classes = []
+    pagination_class = CategoryCursorPagination
+
+    def get_queryset(self):
+        return categories_with_counts()
+
+    def _page(self, request, *args, **kwargs):
+        # links are absolute to the requesting host, so only their cursors are cached
+        cursor_param = self.pagination_class.cursor_query_param
+        data = super().list(request, *args, **kwargs).data
+        cursors = {
+            name: parse_qs(urlsplit(data[name]).query)[cursor_param][0] if data[name] else None
+            for name in ('next', 'previous')
+        }
+        return {"cursors": cursors, "results": data['results']}
+
+    def list(self, request, *args, **kwargs):
+        # pages are cached until a category changes or a product is added,
+        # removed or moved (see apps/products/signals.py)
+        paginator = self.pagination_class
+        page = cache_tier.get_or_set(
+            cache_tier.CATEGORIES, 'list',
+            request.query_params.get(paginator.cursor_query_param, ''),
+            request.query_params.get(paginator.page_size_query_param, ''),
+            compute=lambda: self._page(request, *args, **kwargs),
+        )
+
+        url = request.build_absolute_uri()
+        links = {
+            name: replace_query_param(url, paginator.cursor_query_param, cursor) if cursor else None
+            for name, cursor in page['cursors'].items()
+        }
+        return Response({**links, "results": page['results']})
 
+
+# GET /api/categories/<name>/?cursor=&viewer=
 class CategoryDetailsView(generics.RetrieveAPIView):
-    authentication_classes = []
-    queryset = Category.objects.prefetch_related("products").all()
+    """
+    The category with its count, cached like the list, and one cursor page
+    of its products as cards: one query once the header is cached.
+    """
+    authentication_classes = [OptionalJWTAuthentication]
     serializer_class = CategorySerializer
-    lookup_field = "name"
\ No newline at end of file
+    pagination_class = ProductCursorPagination
+    lookup_field = "name"
+
+    def get_queryset(self):
+        return categories_with_counts()
+
+    def retrieve(self, request, *args, **kwargs):
+        category = cache_tier.get_or_set(
+            cache_tier.CATEGORIES, 'detail', kwargs[self.lookup_field],
+            compute=lambda: self.get_serializer(self.get_object()).data,
+        )
+
+        paginator = self.paginator
+        page = paginator.paginate_queryset(
+            Product.objects.for_cards().filter(category_id=category['id']),
+            request,
+            view=self,
+        )
+        cards = ProductCardSerializer(page, many=True).data
+        if wants_viewer_state(request):
+            add_viewer_state(request, cards)
+
+        return Response({
+            **category,
+            "products": {
+                "next": paginator.get_next_link(),
+                "previous": paginator.get_previous_link(),
+                "results": cards,
+            },
+        })
@@ -1,4 +1,4 @@
-from ..serializers.products_serializers import ProductSerializer, ReviewSerializer
+from ..serializers.products_serializers import ProductSerializer, ReviewSerializer, WishlistItemSerializer
 from apps.products.models import Product
 
 from rest_framework import permissions
@@ -11,16 +11,107 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import F
+from rest_framework.filters import OrderingFilter
+from rest_framework.renderers import JSONRenderer
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from common.pagination import ProductCursorPagination, WishlistCursorPagination
+from integrations import redis as cache_tier
+from apps.products.search import ProductSearch, min_rating
+from apps.products import wishlist
+from apps.products.viewer import add_viewer_state, wants_viewer_state
+from common.authentication import OptionalJWTAuthentication
+import hashlib
+import uuid
 
 class ShopProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    authentication_classes = []
+    # anonymous browsing works as before; a token adds the ?viewer=1 state
+    authentication_classes = [OptionalJWTAuthentication]
     permission_classes = []
+    pagination_class = ProductCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at', 'rating_avg', 'rating_count', 'sales_count']
+    ordering = ('-created_at', '-id')
+
+    def get_queryset(self):
+        # catalog reads go through one planned queryset so the number of
+        # queries stays constant however many products are on the page
+        if self.action not in ['list', 'retrieve']:
+            return super().get_queryset()
+
+        queryset = Product.objects.for_catalog(self.selected_relations())
+
+        # ?min_rating=4 reads the stored average, no aggregation needed
+        rating = min_rating(self.request.query_params)
+        if rating is not None:
+            queryset = queryset.filter(rating_avg__gte=rating)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if wants_viewer_state(request):
+            add_viewer_state(request, response.data['results'])
+        return response
+
+    def selected_relations(self):
+        # ?fields= / ?expand= also decide what gets prefetched
+        return ProductSerializer.selected_relations(self.request)
+
+    # GET /api/products/search/?q=&category=&merchant=&min_price=&max_price=
+    #                           &on_sale=&min_rating=&sort=&viewer=
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        product_search = ProductSearch(
+            request.query_params, Product.objects.for_catalog(self.selected_relations())
+        )
+
+        # ordering comes from ?sort=, not from the list view's OrderingFilter
+        paginator = self.pagination_class()
+        paginator.ordering = product_search.ordering
+        page = paginator.paginate_queryset(product_search.results(), request)
+
+        response = paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+        if wants_viewer_state(request):
+            add_viewer_state(request, response.data['results'])
+        response.data['facets'] = product_search.facets()
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        # the detail payload is rendered once and served from the cache until
+        # one of the rows it embeds changes (see apps/products/signals.py)
+        try:
+            product_id = uuid.UUID(str(kwargs[self.lookup_field]))
+        except ValueError:
+            raise Http404
+
+        # sparse responses are cheap to build and not worth a cache entry each
+        if ProductSerializer.selected_fields(request) is not None:
+            return Response(self.get_serializer(self.get_object()).data)
+
+        payload = cache_tier.get_or_set(
+            cache_tier.PRODUCTS, 'detail', product_id,
+            compute=self.render_detail,
+        )
+
+        if payload['etag'] in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload['body'], content_type='application/json')
+        response['ETag'] = payload['etag']
+        return response
+
+    def render_detail(self):
+        serializer = self.get_serializer(self.get_object())
+        body = JSONRenderer().render(serializer.data)
+        return {
+            'etag': '"%s"' % hashlib.md5(body).hexdigest(),
+            'body': body,
+        }
 
 
 class ProductReviewCreateView(generics.CreateAPIView):
@@ -34,37 +125,64 @@ class ProductReviewCreateView(generics.CreateAPIView):
         serializer.save(user=self.request.user, product=product)
 
 
-@api_view(['GET', 'POST'])
+# GET    /api/products/products/<id>/wishlist/  -> is it wishlisted
+# PUT    /api/products/products/<id>/wishlist/  -> add, idempotent
+# DELETE /api/products/products/<id>/wishlist/  -> remove, idempotent
+# POST   /api/products/products/<id>/wishlist/  -> toggle
+@api_view(['GET', 'POST', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
 def add_or_remove_to_wishlist(request, product_id):
+    if request.method == 'GET':
+        return Response({
+            "added": product_id in wishlist.wishlisted_ids(request.user, [product_id])
+        }, status=status.HTTP_200_OK)
+
     try:
-        product = Product.objects.get(id=product_id)
+        if request.method == 'PUT':
+            changed, likes_count = wishlist.add(request.user, product_id)
+            wishlisted = True
+        elif request.method == 'DELETE':
+            changed, likes_count = wishlist.remove(request.user, product_id)
+            wishlisted = False
+        else:
+            wishlisted, likes_count = wishlist.toggle(request.user, product_id)
+            changed = True
     except Product.DoesNotExist:
         return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    wishlist = Wishlist.objects.filter(product=product, user=request.user).first()
+    return Response({
+        'wishlisted': wishlisted,
+        'likes_count': likes_count,
+    }, status=status.HTTP_201_CREATED if wishlisted and changed else status.HTTP_200_OK)
 
-    if request.method == 'GET':
-        return Response({
-            "added": True if wishlist else False
-        }, status=status.HTTP_200_OK)
 
-    # POST → Toggle the like
-    if wishlist:
-        # Unwishlist
-        wishlist.delete()
+# GET /api/products/products/wishlist/?cursor=
+class WishlistListView(generics.ListAPIView):
+    """The signed-in user's wishlist as product cards: one joined query per page."""
+    serializer_class = WishlistItemSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = WishlistCursorPagination
 
-        return Response({
-            'removed': False,
-        }, status=status.HTTP_200_OK)
-    else:
-        # Like
-        Wishlist.objects.create(product=product, user=request.user)
-        Product.objects.filter(id=product_id).update(likes_count=F('likes_count') + 1)
-        product.refresh_from_db()
+    def get_queryset(self):
+        return wishlist.items(self.request.user)
 
-        return Response({
-            'liked': True,
-            'likes_count': product.likes_count
-        }, status=status.HTTP_201_CREATED)
 
+# GET /api/products/products/wishlisted/?ids=<id>,<id>,...
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def wishlisted_products(request):
+    """Which of the given product ids the user has wishlisted: one query for a whole page of cards."""
+    try:
+        product_ids = [
+            uuid.UUID(value) for value in request.query_params.get('ids', '').split(',') if value.strip()
+        ]
+    except ValueError:
+        return Response({'error': 'ids must be product UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(product_ids) > wishlist.LOOKUP_LIMIT:
+        return Response(
+            {'error': f'At most {wishlist.LOOKUP_LIMIT} ids per request'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    wishlisted = wishlist.wishlisted_ids(request.user, product_ids)
+    return Response({'wishlisted': [str(product_id) for product_id in product_ids if product_id in wishlisted]})
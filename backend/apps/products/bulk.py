@@ -0,0 +1,398 @@
+"""
+Bulk product import and export for merchants.
+
+Rows are read one at a time from a CSV or JSON Lines stream and handled in
+batches. Each batch is validated in memory, with categories resolved by
+name from a single lookup map. Its valid rows are then written in one
+transaction with a ``bulk_create`` per table: products, inventories,
+features and specifications. Invalid rows are skipped and reported by
+line number, so one bad row does not sink the file.
+
+``bulk_create`` bypasses ``Product.save()``, so neither ``full_clean()``
+nor the post_save signals run for imported rows. The row serializer
+enforces the same field rules. The search index and the category caches
+are refreshed once per batch after it commits.
+
+Exports stream the merchant's catalog with ``iterator()`` in the same
+format, so an export can be edited and imported again.
+
+Price and stock changes to existing products go through
+``update_products``. Each batch loads the merchant's rows in one locked
+query, applies and checks the changes in memory and saves them with one
+``bulk_update``. Then it drops the cached product details in one call.
+
+CSV columns are those of ``FIELDS``. ``features`` holds ``|``-separated
+names and ``specifications`` holds ``|``-separated ``title: body`` pairs.
+In JSON Lines both are lists; specifications are ``{"title", "body"}``
+objects.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from integrations import redis as cache_tier
+from . import search
+from .models import Category, Feature, Product, ProductInventory, ProductSpecification
+
+FORMATS = ("csv", "jsonl")
+FIELDS = [
+    "name", "description", "category", "stock", "original_price", "sale_price",
+    "is_on_sale", "sku", "features", "specifications",
+]
+LIST_SEPARATOR = "|"
+BATCH_SIZE = 500
+# the product columns a bulk update may change
+UPDATE_FIELDS = ["original_price", "sale_price", "is_on_sale", "stock", "is_active"]
+# rows accepted by one bulk update request
+UPDATE_LIMIT = 10000
+# errors kept in a report; the counts stay exact past this
+MAX_REPORTED_ERRORS = 1000
+
+
+class SpecificationRowSerializer(serializers.Serializer):
+    title = serializers.CharField(max_length=100)
+    body = serializers.CharField(max_length=255)
+
+
+class ProductRowSerializer(serializers.Serializer):
+    """One imported product. Mirrors the model field rules without touching the database."""
+    name = serializers.CharField(max_length=100)
+    description = serializers.CharField(max_length=255)
+    category = serializers.CharField(max_length=100)
+    stock = serializers.IntegerField(min_value=0, default=0)
+    original_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    sale_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, allow_null=True)
+    is_on_sale = serializers.BooleanField(default=False)
+    sku = serializers.CharField(max_length=100, required=False, allow_blank=True, default="")
+    features = serializers.ListField(child=serializers.CharField(max_length=100), required=False, default=list)
+    specifications = SpecificationRowSerializer(many=True, required=False, default=list)
+
+    def validate_category(self, value):
+        category_id = self.context["categories"].get(value.strip().lower())
+        if category_id is None:
+            raise serializers.ValidationError(f"Unknown category '{value}'.")
+        return category_id
+
+    def validate(self, attrs):
+        if attrs["is_on_sale"] and attrs.get("sale_price") is None:
+            raise serializers.ValidationError({"sale_price": "Required when is_on_sale is set."})
+        return attrs
+
+
+class ProductUpdateRowSerializer(serializers.Serializer):
+    """The changes for one existing product. Fields left out are kept."""
+    id = serializers.UUIDField()
+    original_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    sale_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, allow_null=True)
+    is_on_sale = serializers.BooleanField(required=False)
+    stock = serializers.IntegerField(min_value=0, required=False)
+    is_active = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError(f"Give at least one of {', '.join(UPDATE_FIELDS)}.")
+        return attrs
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {"created": self.created, "failed": self.failed, "errors": self.errors}
+
+
+# --------------------------------------
+# Reading
+# --------------------------------------
+
+def _split(value):
+    return [part.strip() for part in (value or "").split(LIST_SEPARATOR) if part.strip()]
+
+
+def _csv_rows(stream):
+    # line 1 is the header
+    for line, row in enumerate(csv.DictReader(stream), start=2):
+        row = {key: value for key, value in row.items() if key is not None}
+        if row.get("sale_price", None) == "":
+            row["sale_price"] = None
+        row["features"] = _split(row.get("features"))
+        row["specifications"] = [
+            dict(zip(("title", "body"), (part.strip() for part in spec.split(":", 1))))
+            for spec in _split(row.get("specifications"))
+        ]
+        yield line, row
+
+
+def _jsonl_rows(stream):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError as exc:
+            yield line, {"__error__": f"Invalid JSON: {exc}"}
+            continue
+        yield line, row if isinstance(row, dict) else {"__error__": "Each line must be a JSON object."}
+
+
+def read_rows(stream, fmt):
+    """Yields ``(line, row)`` from a text stream without reading it all in."""
+    if fmt == "csv":
+        return _csv_rows(stream)
+    return _jsonl_rows(stream)
+
+
+def text_stream(binary):
+    """Wraps an uploaded or opened binary file for ``read_rows``."""
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+# --------------------------------------
+# Importing
+# --------------------------------------
+
+def category_map():
+    """Lowercased category name -> id, the one lookup an import needs."""
+    return {name.lower(): pk for pk, name in Category.objects.values_list("id", "name")}
+
+
+def _write(merchant, rows):
+    products, inventories, features, specifications = [], [], [], []
+    for row in rows:
+        product = Product(
+            merchant=merchant,
+            category_id=row["category"],
+            name=row["name"],
+            description=row["description"],
+            stock=row["stock"],
+            original_price=row["original_price"],
+            sale_price=row.get("sale_price"),
+            is_on_sale=row["is_on_sale"],
+        )
+        products.append(product)
+        if row["sku"]:
+            inventories.append(ProductInventory(product=product, sku=row["sku"]))
+        features += [Feature(product=product, name=name) for name in row["features"]]
+        specifications += [ProductSpecification(product=product, **spec) for spec in row["specifications"]]
+
+    with transaction.atomic():
+        Product.objects.bulk_create(products)
+        ProductInventory.objects.bulk_create(inventories)
+        Feature.objects.bulk_create(features)
+        ProductSpecification.objects.bulk_create(specifications)
+
+        # what the skipped post_save signals would have done
+        product_ids = [product.pk for product in products]
+        transaction.on_commit(lambda: search.reindex_products(product_ids))
+        transaction.on_commit(lambda: cache_tier.invalidate(cache_tier.CATEGORIES))
+    return len(products)
+
+
+def _import_batch(merchant, batch, categories, report, dry_run):
+    valid = []
+    for line, row in batch:
+        if "__error__" in row:
+            report.add_error(line, {"non_field_errors": [row["__error__"]]})
+            continue
+        serializer = ProductRowSerializer(data=row, context={"categories": categories})
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            report.add_error(line, serializer.errors)
+
+    if valid:
+        report.created += len(valid) if dry_run else _write(merchant, valid)
+
+
+def import_products(merchant, rows, batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Creates products for ``merchant`` from ``(line, row)`` pairs, one
+    transaction per batch. With ``dry_run`` rows are only validated.
+    Returns an ``ImportReport``.
+    """
+    categories = category_map()
+    report = ImportReport()
+
+    batch = []
+    for line, row in rows:
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            _import_batch(merchant, batch, categories, report, dry_run)
+            batch = []
+    if batch:
+        _import_batch(merchant, batch, categories, report, dry_run)
+    return report
+
+
+# --------------------------------------
+# Updating
+# --------------------------------------
+
+@dataclass
+class UpdateReport:
+    updated: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self):
+        return {"updated": self.updated, "failed": self.failed, "errors": self.errors}
+
+
+def _invalidate_details(product_ids):
+    # the detail caches of one batch go in a single round trip
+    prefix = cache_tier.make_key(cache_tier.PRODUCTS, "detail")
+    keys = [f"{prefix}:{product_id}" for product_id in product_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@transaction.atomic
+def _update_batch(merchant, batch, report):
+    changes = {}
+    for index, row in batch:
+        serializer = ProductUpdateRowSerializer(data=row)
+        if not serializer.is_valid():
+            report.add_error(index, serializer.errors)
+        elif serializer.validated_data["id"] in changes:
+            report.add_error(index, {"id": ["Listed more than once in this batch."]})
+        else:
+            values = dict(serializer.validated_data)
+            changes[values.pop("id")] = (index, values)
+    if not changes:
+        return
+
+    # lock in the pk order reserve_stock uses, so overlapping bulk updates
+    # and checkouts queue on each other instead of deadlocking
+    products = {
+        product.pk: product
+        for product in Product.objects.select_for_update()
+        .filter(merchant=merchant, pk__in=changes)
+        .order_by("pk")
+        .only("id", *UPDATE_FIELDS)
+    }
+
+    now = timezone.now()
+    changed, fields = [], {"updated_at"}
+    for product_id, (index, values) in changes.items():
+        product = products.get(product_id)
+        if product is None:
+            report.add_error(index, {"id": ["No such product for this merchant."]})
+            continue
+        for name, value in values.items():
+            setattr(product, name, value)
+        if product.is_on_sale and product.sale_price is None:
+            # only the rows that pass go into the update
+            report.add_error(index, {"sale_price": ["Required when is_on_sale is set."]})
+            continue
+        product.updated_at = now
+        changed.append(product)
+        fields.update(values)
+
+    if changed:
+        Product.objects.bulk_update(changed, sorted(fields))
+        _invalidate_details([product.pk for product in changed])
+        report.updated += len(changed)
+
+
+def update_products(merchant, rows, batch_size=BATCH_SIZE):
+    """
+    Applies ``(row, changes)`` pairs to ``merchant``'s products, one
+    transaction and one ``bulk_update`` per batch. Returns an ``UpdateReport``.
+
+    Like imports this skips ``full_clean()`` and the model signals. The row
+    serializer checks the same rules, and each batch drops the cached
+    details of its products. The search index holds no prices or stock, so
+    it is left alone.
+    """
+    report = UpdateReport()
+
+    batch = []
+    for index, row in rows:
+        batch.append((index, row))
+        if len(batch) >= batch_size:
+            _update_batch(merchant, batch, report)
+            batch = []
+    if batch:
+        _update_batch(merchant, batch, report)
+    return report
+
+
+# --------------------------------------
+# Exporting
+# --------------------------------------
+
+def _export_queryset(merchant):
+    return (
+        Product.objects.filter(merchant=merchant)
+        .select_related("category", "inventory")
+        .defer("search_vector")
+        .prefetch_related("features", "specifications")
+        .order_by("created_at", "id")
+    )
+
+
+def _export_row(product):
+    inventory = getattr(product, "inventory", None)
+    return {
+        "name": product.name,
+        "description": product.description,
+        "category": product.category.name,
+        "stock": product.stock,
+        "original_price": product.original_price,
+        "sale_price": product.sale_price,
+        "is_on_sale": product.is_on_sale,
+        "sku": inventory.sku if inventory else "",
+        "features": [feature.name for feature in product.features.all() if feature.name],
+        "specifications": [
+            {"title": spec.title, "body": spec.body} for spec in product.specifications.all()
+        ],
+    }
+
+
+class _Echo:
+    """A file-like object that hands back what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def export_products(merchant, fmt, chunk_size=BATCH_SIZE):
+    """Yields the merchant's catalog as CSV or JSON Lines text, ``chunk_size`` products in memory at a time."""
+    rows = (
+        _export_row(product)
+        for product in _export_queryset(merchant).iterator(chunk_size=chunk_size)
+    )
+
+    if fmt == "jsonl":
+        for row in rows:
+            yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+        return
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in rows:
+        row["sale_price"] = "" if row["sale_price"] is None else row["sale_price"]
+        row["features"] = LIST_SEPARATOR.join(row["features"])
+        row["specifications"] = LIST_SEPARATOR.join(
+            f"{spec['title']}: {spec['body']}" for spec in row["specifications"]
+        )
+        yield writer.writerow([row[name] for name in FIELDS])
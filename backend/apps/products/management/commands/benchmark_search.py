@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from apps.products.api.shop.views.products_views import ShopProductViewSet
+from apps.products.models import Category, Product
+from apps.products.search import reindex_products
+from apps.users.models import Merchant
+
+TERMS = ["phone", "shoe", "black", "cotton", "wireless", "leather", "kids", "pro"]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the product search endpoint and report p50/p95. Runs against the current "
+        "database, or against --products seeded products that are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--products', type=int, default=0, help="Seed this many products first.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if not options['products']:
+            self._report(self._run(rng, options['runs']))
+            return
+
+        try:
+            with transaction.atomic():
+                self._seed(rng, options['products'], options['batch_size'])
+                self._report(self._run(rng, options['runs']))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rng, count, batch_size):
+        User = get_user_model()
+        categories = [Category.objects.create(name=f"benchmark-search-{i}") for i in range(10)]
+        merchants = [
+            Merchant.objects.create(
+                user=User.objects.create_user(email=f"bench-search-{i}@example.com", password=None),
+                store_name=f"Benchmark search store {i}",
+            )
+            for i in range(10)
+        ]
+        for start in range(0, count, batch_size):
+            Product.objects.bulk_create([
+                Product(
+                    merchant=rng.choice(merchants),
+                    category=rng.choice(categories),
+                    name=" ".join(rng.sample(TERMS, 3)),
+                    description=" ".join(rng.sample(TERMS, 4)),
+                    original_price=Decimal(rng.randint(5, 300)),
+                    stock=10,
+                )
+                for _ in range(start, min(start + batch_size, count))
+            ])
+        # bulk_create skips the signals that keep the search index current
+        reindex_products()
+
+    def _run(self, rng, runs):
+        categories = list(Category.objects.values_list('id', flat=True)[:50])
+        view = ShopProductViewSet.as_view({'get': 'search'})
+        # the paginator builds absolute links, so use a host the settings accept
+        host = next((host.lstrip('.') for host in settings.ALLOWED_HOSTS if host != '*'), 'localhost')
+        factory = RequestFactory(HTTP_HOST=host)
+
+        # one untimed request builds any lazy state (in-process index, caches)
+        view(factory.get('/api/products/search/', {'q': TERMS[0]})).render()
+
+        timings = []
+        for _ in range(runs):
+            params = {'q': rng.choice(TERMS), 'sort': rng.choice(['relevance', 'price', 'newest'])}
+            if categories and rng.random() < 0.5:
+                params['category'] = rng.choice(categories)
+            if rng.random() < 0.3:
+                params['max_price'] = rng.choice([25, 50, 100])
+
+            started = time.perf_counter()
+            view(factory.get('/api/products/search/', params)).render()
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def _report(self, timings):
+        timings.sort()
+        p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+        self.stdout.write(
+            f"{Product.objects.count()} products, {len(timings)} searches: "
+            f"p50 {statistics.median(timings):.1f}ms, p95 {p95:.1f}ms, max {timings[-1]:.1f}ms"
+        )
@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products import bulk
+from apps.users.models import Merchant
+
+
+class Command(BaseCommand):
+    help = "Write a merchant's products as CSV or JSON Lines, in the format import_products reads."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--merchant', required=True, help="Merchant id.")
+        parser.add_argument('--format', choices=bulk.FORMATS, default='csv')
+        parser.add_argument('--output', help="File to write; stdout when omitted.")
+
+    def handle(self, *args, **options):
+        merchant = Merchant.objects.filter(pk=options['merchant']).first()
+        if merchant is None:
+            raise CommandError(f"Merchant {options['merchant']} does not exist")
+
+        chunks = bulk.export_products(merchant, options['format'])
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported products to {options['output']}"))
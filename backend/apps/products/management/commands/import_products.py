@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.products import bulk
+from apps.users.models import Merchant
+
+
+class Command(BaseCommand):
+    help = "Create a merchant's products from a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--merchant', required=True, help="Merchant id.")
+        parser.add_argument('--file', required=True)
+        parser.add_argument('--format', choices=bulk.FORMATS,
+                            help="Defaults to the file extension, csv otherwise.")
+        parser.add_argument('--batch-size', type=int, default=bulk.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Validate the rows without saving them.")
+
+    def handle(self, *args, **options):
+        merchant = Merchant.objects.filter(pk=options['merchant']).first()
+        if merchant is None:
+            raise CommandError(f"Merchant {options['merchant']} does not exist")
+
+        path = options['file']
+        fmt = options['format'] or ('jsonl' if path.endswith('.jsonl') else 'csv')
+        try:
+            with open(path, 'rb') as binary:
+                report = bulk.import_products(
+                    merchant,
+                    bulk.read_rows(bulk.text_stream(binary), fmt),
+                    batch_size=options['batch_size'],
+                    dry_run=options['dry_run'],
+                )
+        except OSError as exc:
+            raise CommandError(exc)
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+
+        verb = "Validated" if options['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report.created} product(s), {report.failed} row(s) rejected"
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.products.models import Product, Review
+from apps.users.models import Merchant, MerchantReview
+from common.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored rating aggregates of products and merchants from their reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--only', choices=['products', 'merchants'],
+            help="Rebuild only one of the two models.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        only = options['only']
+
+        if only in (None, 'products'):
+            with transaction.atomic():
+                rated = rebuild_ratings(Product, Review.objects.all(), 'product', batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {rated} reviewed products"))
+
+        if only in (None, 'merchants'):
+            with transaction.atomic():
+                rated = rebuild_ratings(Merchant, MerchantReview.objects.all(), 'merchant', batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {rated} reviewed merchants"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from apps.products import search
+from apps.products.models import Product
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product search index (tsvector column on Postgres, in-process index otherwise)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if not search.uses_full_text():
+            search.reindex_products()
+            self.stdout.write(self.style.SUCCESS("Rebuilt the in-process search index"))
+            return
+
+        batch_size = options['batch_size']
+        product_ids = Product.objects.order_by('pk').values_list('pk', flat=True)
+
+        batch, total = [], 0
+        for product_id in product_ids.iterator(chunk_size=batch_size):
+            batch.append(product_id)
+            if len(batch) >= batch_size:
+                total += search.reindex_products(batch) or len(batch)
+                batch = []
+                self.stdout.write(f"  indexed {total} products")
+        if batch:
+            total += search.reindex_products(batch) or len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search vectors for {total} products"))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+        ('users', '0002_merchant_merchant_pr_created_13a204_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='products_pr_created_e6f9fc_idx'),
+        ),
+    ]
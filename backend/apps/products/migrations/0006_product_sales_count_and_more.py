@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_search_vector'),
+        ('users', '0003_merchant_rating_1_count_merchant_rating_2_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sales_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-sales_count'], name='products_pr_sales_c_6796bf_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_sales_count_and_more'),
+        ('users', '0004_merchantreview_merchant_re_merchan_9c4be8_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['merchant', '-created_at', '-id'], name='products_pr_merchan_b3a403_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Subquery
+
+
+def backfill_primary_images(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    ProductImage = apps.get_model('products', 'ProductImage')
+
+    # the flagged image if there is one, else the first in display order
+    first_image = (
+        ProductImage.objects.filter(product=OuterRef('pk'))
+        .order_by('-is_primary', 'order', 'created_at')
+        .values('pk')[:1]
+    )
+    Product.objects.update(primary_image=Subquery(first_image))
+    ProductImage.objects.update(
+        is_primary=Exists(Product.objects.filter(primary_image=OuterRef('pk')))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_product_products_pr_merchan_b3a403_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='primary_image',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.productimage'),
+        ),
+        migrations.RunPython(backfill_primary_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:13
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def recount_likes(apps, schema_editor):
+    # removals never decremented the counter before, recount it once
+    Product = apps.get_model('products', 'Product')
+    Wishlist = apps.get_model('products', 'Wishlist')
+
+    likes = (
+        Wishlist.objects.filter(product=OuterRef('pk'))
+        .order_by()
+        .values('product')
+        .annotate(count=Count('id'))
+        .values('count')
+    )
+    Product.objects.update(
+        likes_count=Coalesce(Subquery(likes, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_primary_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(recount_likes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_recount_likes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='wishlist',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='products_wi_user_id_032458_idx'),
+        ),
+    ]
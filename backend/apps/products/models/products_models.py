@@ -1,14 +1,64 @@
 
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import Prefetch
 import uuid 
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings
 from cloudinary.models import CloudinaryField
 from .categories import Category
+from common.ratings import RatingAggregate
 
 
+class ProductQuerySet(models.QuerySet):
 
-class Product(models.Model):
+    # how each relation the product serializer renders is loaded
+    CATALOG_JOINS = ("category", "inventory", "merchant")
+    CATALOG_PREFETCHES = ("images", "specifications", "features", "product_reviews")
+
+    def for_catalog(self, relations=None):
+        """
+        Single planned queryset for catalog listings.
+        To-one relations are joined and every to-many relation the product
+        serializer walks is batched into one prefetch, so the query count
+        does not grow with the page size. Ratings are stored columns.
+        ``relations`` limits the loading to the relations a sparse response
+        renders (see common/fieldsets.py); ``None`` loads all of them.
+        """
+        if relations is None:
+            relations = self.CATALOG_JOINS + self.CATALOG_PREFETCHES
+
+        queryset = self.defer("search_vector")
+        joins = [name for name in self.CATALOG_JOINS if name in relations]
+        if joins:
+            queryset = queryset.select_related(*joins)
+
+        prefetches = []
+        for name in self.CATALOG_PREFETCHES:
+            if name not in relations:
+                continue
+            if name == "product_reviews":
+                prefetches.append(Prefetch(
+                    "product_reviews",
+                    queryset=Review.objects.select_related("user__profile"),
+                ))
+            else:
+                prefetches.append(name)
+        return queryset.prefetch_related(*prefetches)
+
+    def for_cards(self):
+        """
+        Columns a product card shows, with the primary image joined in:
+        one query for any page size.
+        """
+        return self.select_related("primary_image").only(
+            "id", "merchant_id", "category_id", "name", "stock", "is_on_sale", "sale_price",
+            "original_price", "rating_avg", "rating_count", "likes_count", "sales_count",
+            "created_at", "primary_image__image",
+        )
+
+
+class Product(RatingAggregate):
 
     class sale_type(models.TextChoices):
         HOT = "hot_deal", "Hot Deal"
@@ -33,12 +83,30 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     likes_count = models.PositiveIntegerField(default=0)
+    # kept in step by ProductImage.save()/delete(), so cards, carts and
+    # checkout get the image with a join instead of a query per product
+    primary_image = models.ForeignKey(
+        "products.ProductImage", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="+", editable=False,
+    )
+    # units sold in counted sub-orders, kept by apps/orders/sales.py
+    sales_count = models.PositiveIntegerField(default=0)
 
     # Status
     is_active = models.BooleanField(default=True)
     is_featured = models.BooleanField(default=False)
-    
 
+    # full-text document, maintained by apps/products/search.py (Postgres only)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProductQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so moving a product between categories can refresh their counts
+        instance._loaded_category_id = instance.__dict__.get('category_id')
+        return instance
 
     def __str__(self):
         return self.name
@@ -47,12 +115,16 @@ class Product(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['category', '-created_at']),
+            models.Index(fields=['merchant', '-created_at', '-id']),
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['-rating_avg']),
+            models.Index(fields=['-sales_count']),
         ]
 
     @property
     def primary_image_url(self):
-        img = self.images.filter(is_primary=True).first()
-        return img.image.url if img else ""
+        # select_related("primary_image") to keep this query-free
+        return self.primary_image.image.url if self.primary_image_id else ""
 
 
     @property
@@ -94,6 +166,8 @@ class Wishlist(models.Model):
         # Speed up queries
         indexes = [
             models.Index(fields=['product', 'user']),
+            # the user's wishlist page, newest first
+            models.Index(fields=['user', '-created_at', '-id']),
         ]
 
 class ProductInventory(models.Model):
@@ -143,16 +217,45 @@ class ProductImage(models.Model):
     class Meta:
         ordering = ['order', '-is_primary', 'created_at']
 
+    def _lock_product(self):
+        # serializes primary-image changes of one product
+        return (
+            Product.objects.select_for_update()
+            .filter(pk=self.product_id)
+            .values_list("primary_image_id", flat=True)
+            .first()
+        )
+
     def save(self, *args, **kwargs):
-        # If this is set as primary, unset all other primary images for this product
-        if self.is_primary:
-            ProductImage.objects.filter(product=self.product, is_primary=True).update(is_primary=False)
-        
-        # If no primary image exists, make this one primary
-        if not ProductImage.objects.filter(product=self.product, is_primary=True).exists():
-            self.is_primary = True
-            
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            primary_id = self._lock_product()
+
+            # the first image becomes primary, and the primary one stays so
+            # until another image takes over
+            if primary_id is None or (self.pk is not None and primary_id == self.pk):
+                self.is_primary = True
+
+            # unset the previous primary image
+            if self.is_primary and primary_id is not None and primary_id != self.pk:
+                ProductImage.objects.filter(pk=primary_id).update(is_primary=False)
+
+            super().save(*args, **kwargs)
+
+            if self.is_primary and primary_id != self.pk:
+                Product.objects.filter(pk=self.product_id).update(primary_image=self)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            primary_id, pk = self._lock_product(), self.pk
+            result = super().delete(*args, **kwargs)
+
+            if primary_id == pk:
+                # the next image in display order takes over
+                successor = ProductImage.objects.filter(product_id=self.product_id).first()
+                if successor is not None:
+                    ProductImage.objects.filter(pk=successor.pk).update(is_primary=True)
+                Product.objects.filter(pk=self.product_id).update(primary_image=successor)
+            return result
 
     def __str__(self):
         return f"{self.product.name} - Image {self.order}"
@@ -170,16 +273,12 @@ class Review(models.Model):
         ordering = ['-created_at']
         unique_together = ['product', 'user']  # One review per user per product
 
-    # def save(self, *args, **kwargs):
-    #     super().save(*args, **kwargs)
-    #     # Update product rating after saving review
-    #     self.product.update_rating()
-
-    def delete(self, *args, **kwargs):
-        product = self.product
-        super().delete(*args, **kwargs)
-        # Update product rating after deleting review
-        product.update_rating()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so product rating aggregates can apply the change as a delta
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
 
     def __str__(self):
         return f"{self.user.email} - {self.product.name} ({self.rating}★)"
@@ -0,0 +1,373 @@
+"""
+Product search.
+
+On Postgres every product carries a weighted ``search_vector`` (name,
+category and features, then description and specifications) behind a GIN
+index, and queries run as ``websearch_to_tsquery`` matches ranked with
+``ts_rank``. SQLite has no full-text type, so dev falls back to an
+in-process inverted index built from the same fields, which passes at
+most ``FALLBACK_CANDIDATES`` matches on to the database. Both backends keep
+themselves current through ``reindex_products``, called from
+apps/products/signals.py.
+"""
+import bisect
+import heapq
+import re
+import threading
+import uuid
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, Count, DecimalField, F, Q, When
+from rest_framework import serializers
+
+from apps.products.models import Category, Feature, Product, ProductSpecification
+
+SEARCH_CONFIG = "english"
+
+PRICE_BANDS = [
+    (None, 25),
+    (25, 50),
+    (50, 100),
+    (100, 250),
+    (250, None),
+]
+
+RATING_THRESHOLDS = [4, 3, 2, 1]
+
+# the SQLite fallback hands at most this many matches to the database
+FALLBACK_CANDIDATES = 1000
+
+SORTS = {
+    "newest": ("-created_at", "-id"),
+    "price": ("effective_price_value", "-id"),
+    "-price": ("-effective_price_value", "-id"),
+    "popularity": ("-likes_count", "-id"),
+    "rating": ("-rating_avg", "-id"),
+    "best_selling": ("-sales_count", "-id"),
+    "relevance": ("-rank", "-id"),
+}
+
+
+def uses_full_text():
+    return connection.vendor == "postgresql"
+
+
+# --------------------------------------
+# Postgres: tsvector maintenance
+# --------------------------------------
+
+def _update_search_vectors(product_ids=None):
+    product = Product._meta.db_table
+    category = Category._meta.db_table
+    feature = Feature._meta.db_table
+    spec = ProductSpecification._meta.db_table
+
+    sql = f"""
+        UPDATE {product} AS p SET search_vector =
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(p.name, '')), 'A') ||
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(c.name, '')), 'B') ||
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(
+                (SELECT string_agg(f.name, ' ') FROM {feature} f WHERE f.product_id = p.id), ''
+            )), 'B') ||
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(p.description, '')), 'C') ||
+            setweight(to_tsvector(%(config)s::regconfig, coalesce(
+                (SELECT string_agg(s.title || ' ' || s.body, ' ') FROM {spec} s WHERE s.product_id = p.id), ''
+            )), 'C')
+        FROM {category} AS c
+        WHERE c.id = p.category_id
+    """
+    params = {"config": SEARCH_CONFIG}
+    if product_ids is not None:
+        sql += " AND p.id = ANY(%(ids)s)"
+        params["ids"] = list(product_ids)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+# --------------------------------------
+# SQLite: in-process inverted index
+# --------------------------------------
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def _documents(queryset):
+    queryset = (
+        queryset.select_related("category")
+        .prefetch_related("features", "specifications")
+        .only("id", "name", "description", "category__name")
+    )
+    for product in queryset.iterator(chunk_size=2000):
+        parts = [product.name, product.description, product.category.name]
+        parts += [feature.name or "" for feature in product.features.all()]
+        for spec in product.specifications.all():
+            parts += [spec.title, spec.body]
+        yield product.pk, set(tokenize(" ".join(parts)))
+
+
+class InvertedIndex:
+    """
+    token -> product ids, plus a sorted vocabulary so the last query term
+    can be matched as a prefix while the user is still typing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._tokens_by_product = {}
+        self._vocabulary = []
+        self._built = False
+
+    def _add(self, product_id, tokens):
+        self._tokens_by_product[product_id] = tokens
+        for token in tokens:
+            if token not in self._postings:
+                self._postings[token] = set()
+                bisect.insort(self._vocabulary, token)
+            self._postings[token].add(product_id)
+
+    def _remove(self, product_id):
+        for token in self._tokens_by_product.pop(product_id, ()):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def build(self):
+        with self._lock:
+            self._postings, self._tokens_by_product, self._vocabulary = {}, {}, []
+            for product_id, tokens in _documents(Product.objects.all()):
+                self._add(product_id, tokens)
+            self._built = True
+
+    def reindex(self, product_ids):
+        # nothing to keep current until the first search builds the index
+        if not self._built:
+            return
+        product_ids = set(product_ids)
+        documents = dict(_documents(Product.objects.filter(pk__in=product_ids)))
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+                if product_id in documents:
+                    self._add(product_id, documents[product_id])
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = set()
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def _rank(self, product_id, last_term):
+        # whole-word matches on the last term first, then the shortest documents
+        tokens = self._tokens_by_product[product_id]
+        return (last_term not in tokens, len(tokens), str(product_id))
+
+    def search(self, text, limit=None):
+        """
+        Ids of the products matching every term, the last one as a prefix.
+        With ``limit`` only the best ranked ``limit`` ids are returned.
+        """
+        if not self._built:
+            self.build()
+        terms = tokenize(text)
+        if not terms:
+            return set()
+        with self._lock:
+            result = None
+            for position, term in enumerate(terms):
+                if position == len(terms) - 1:
+                    ids = self._prefix_matches(term)
+                else:
+                    ids = set(self._postings.get(term, ()))
+                result = ids if result is None else result & ids
+                if not result:
+                    return set()
+            if limit is not None and len(result) > limit:
+                result = set(heapq.nsmallest(limit, result, key=lambda pk: self._rank(pk, terms[-1])))
+            return result
+
+
+inverted_index = InvertedIndex()
+
+
+def reindex_products(product_ids=None):
+    if uses_full_text():
+        return _update_search_vectors(product_ids)
+    elif product_ids is None:
+        inverted_index.build()
+    else:
+        inverted_index.reindex(product_ids)
+
+
+# --------------------------------------
+# Querying
+# --------------------------------------
+
+def effective_price():
+    return Case(
+        When(is_on_sale=True, sale_price__isnull=False, then=F("sale_price")),
+        default=F("original_price"),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def _price_band_q(low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(effective_price_value__gte=low)
+    if high is not None:
+        q &= Q(effective_price_value__lt=high)
+    return q
+
+
+def _band_label(low, high):
+    if low is None:
+        return f"under_{high}"
+    if high is None:
+        return f"{low}_plus"
+    return f"{low}_{high}"
+
+
+def _number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _uuid(params, name):
+    # a malformed id is the client's mistake, not a 500 from the database
+    try:
+        return uuid.UUID(params[name])
+    except ValueError:
+        raise serializers.ValidationError({name: "Must be a valid UUID."})
+
+
+def min_rating(params):
+    """``?min_rating=`` as a float, ``None`` if absent. Outside 0-5 is a 400."""
+    value = params.get("min_rating")
+    if not value:
+        return None
+    rating = _number(value)
+    if rating is None or not 0 <= rating <= 5:
+        raise serializers.ValidationError({"min_rating": "Must be a number between 0 and 5."})
+    return rating
+
+
+class ProductSearch:
+    """
+    Parses the search query params into a text match plus a set of named
+    filters. Facets are counted with every filter applied except their own,
+    so picking a category still shows the counts for its siblings.
+    """
+
+    def __init__(self, params, queryset=None):
+        self.text = (params.get("q") or "").strip()
+        self.sort = params.get("sort") or ("relevance" if self.text else "newest")
+        if self.sort not in SORTS or (self.sort == "relevance" and not (self.text and uses_full_text())):
+            self.sort = "newest"
+
+        queryset = queryset if queryset is not None else Product.objects.all()
+        self.base = self._match(queryset.annotate(effective_price_value=effective_price()))
+        self.filters = self._filters(params)
+
+    def _match(self, queryset):
+        if not self.text:
+            return queryset
+        if uses_full_text():
+            query = SearchQuery(self.text, config=SEARCH_CONFIG, search_type="websearch")
+            return queryset.filter(search_vector=query).annotate(
+                rank=SearchRank(F("search_vector"), query)
+            )
+        return queryset.filter(pk__in=inverted_index.search(self.text, limit=FALLBACK_CANDIDATES))
+
+    def _filters(self, params):
+        filters = {"active": Q(is_active=True)}
+
+        if params.get("category"):
+            filters["category"] = Q(category_id=_uuid(params, "category"))
+        if params.get("merchant"):
+            filters["merchant"] = Q(merchant_id=_uuid(params, "merchant"))
+
+        price = Q()
+        min_price = _number(params.get("min_price"))
+        max_price = _number(params.get("max_price"))
+        if min_price is not None:
+            price &= Q(effective_price_value__gte=min_price)
+        if max_price is not None:
+            price &= Q(effective_price_value__lte=max_price)
+        if price:
+            filters["price"] = price
+
+        if params.get("on_sale") in ("1", "true", "True"):
+            filters["on_sale"] = Q(is_on_sale=True)
+
+        rating = min_rating(params)
+        if rating is not None:
+            filters["rating"] = Q(rating_avg__gte=rating)
+
+        return filters
+
+    def _filtered(self, exclude=None):
+        conditions = [q for name, q in self.filters.items() if name != exclude]
+        return self.base.filter(*conditions)
+
+    @property
+    def ordering(self):
+        return SORTS[self.sort]
+
+    def results(self):
+        return self._filtered()
+
+    def facets(self):
+        categories = (
+            self._filtered(exclude="category")
+            .values("category_id", "category__name")
+            .annotate(count=Count("id"))
+            .order_by("-count")
+        )
+        merchants = (
+            self._filtered(exclude="merchant")
+            .values("merchant_id", "merchant__store_name")
+            .annotate(count=Count("id"))
+            .order_by("-count")[:20]
+        )
+        price_bands = self._filtered(exclude="price").aggregate(**{
+            _band_label(low, high): Count("id", filter=_price_band_q(low, high))
+            for low, high in PRICE_BANDS
+        })
+        on_sale = self._filtered(exclude="on_sale").aggregate(
+            on_sale=Count("id", filter=Q(is_on_sale=True))
+        )["on_sale"]
+        ratings = self._filtered(exclude="rating").aggregate(**{
+            f"{stars}_up": Count("id", filter=Q(rating_avg__gte=stars))
+            for stars in RATING_THRESHOLDS
+        })
+
+        return {
+            "categories": [
+                {"id": row["category_id"], "name": row["category__name"], "count": row["count"]}
+                for row in categories
+            ],
+            "merchants": [
+                {"id": row["merchant_id"], "name": row["merchant__store_name"], "count": row["count"]}
+                for row in merchants
+            ],
+            "price": price_bands,
+            "on_sale": on_sale,
+            "rating": ratings,
+        }
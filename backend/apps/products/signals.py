@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.products.models import (
+    Category, Feature, Product, ProductImage, ProductInventory, ProductSpecification, Review, Wishlist
+)
+from apps.products import search, wishlist
+from common.ratings import rating_delta, rebuild_ratings
+from integrations import redis as cache_tier
+
+
+def product_detail_keys(instance):
+    product_id = instance.pk if isinstance(instance, Product) else instance.product_id
+    return [(cache_tier.PRODUCTS, 'detail', product_id)]
+
+
+# a product detail payload embeds all of these rows
+for model in (Product, ProductImage, ProductSpecification, Feature, Review, ProductInventory):
+    cache_tier.invalidate_on_change(model, cache_tier.PRODUCTS, keys=product_detail_keys)
+
+# product payloads embed their category
+cache_tier.invalidate_on_change(Category, cache_tier.CATEGORIES, cache_tier.PRODUCTS)
+
+
+def invalidate_category_counts():
+    transaction.on_commit(lambda: cache_tier.invalidate(cache_tier.CATEGORIES))
+
+
+# category payloads carry product counts: only adding, removing or
+# moving a product changes them, not every product edit
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_category_id', None)
+    instance._loaded_category_id = instance.category_id
+    if created or previous != instance.category_id:
+        invalidate_category_counts()
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    invalidate_category_counts()
+
+
+@receiver(pre_delete, sender=Product)
+def product_deleting(sender, instance, **kwargs):
+    # the cascade removes wishlist rows without going through apps/products/wishlist.py
+    wishlist.forget(Wishlist.objects.filter(product=instance).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_rating', None)
+
+    if not created and previous is None:
+        # we don't know what the old rating was, recount this product
+        with transaction.atomic():
+            rebuild_ratings(Product, Review.objects.all(), 'product', ids=[instance.product_id])
+    elif created or previous != instance.rating:
+        Product.objects.filter(pk=instance.product_id).update(
+            **rating_delta(added=instance.rating, removed=previous)
+        )
+
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    removed = getattr(instance, '_loaded_rating', instance.rating)
+    Product.objects.filter(pk=instance.product_id).update(**rating_delta(removed=removed))
+
+
+# keep the search index in step with the fields it is built from
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Feature)
+@receiver([post_save, post_delete], sender=ProductSpecification)
+def reindex_product(sender, instance, **kwargs):
+    product_id = instance.pk if sender is Product else instance.product_id
+    transaction.on_commit(lambda: search.reindex_products([product_id]))
+
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created, **kwargs):
+    if created:
+        return
+
+    def run():
+        product_ids = list(instance.products.values_list('id', flat=True))
+        search.reindex_products(product_ids)
+
+    transaction.on_commit(run)
@@ -0,0 +1,72 @@
+import cloudinary
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.models import Feature, ProductImage, ProductInventory, ProductSpecification, Review
+from common.testing import make_category, make_merchant, make_product, make_user
+
+# the page of products, then one batch each for images, specifications,
+# features and reviews; category, inventory and merchant are joined in
+CATALOG_QUERY_BUDGET = 5
+
+
+class CatalogListTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # image URLs are built locally but need a cloud name, which CI may not set
+        if not cloudinary.config().cloud_name:
+            cloudinary.config(cloud_name="test")
+
+    def setUp(self):
+        cache.clear()
+        merchant = make_merchant()
+        category = make_category()
+        reviewers = [make_user() for _ in range(2)]
+        for _ in range(5):
+            product = make_product(merchant, category)
+            ProductImage.objects.create(product=product, image="products/sample.jpg")
+            ProductSpecification.objects.create(product=product, title="Size", body="42")
+            Feature.objects.create(product=product, name="Waterproof")
+            ProductInventory.objects.create(product=product, sku="SKU")
+            for reviewer in reviewers:
+                Review.objects.create(product=product, user=reviewer, rating=4, comment="Good")
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        for page_size in (1, 5):
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(CATALOG_QUERY_BUDGET):
+                    response = self.client.get(reverse("products-list"), {"page_size": page_size})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_client_ordering_pages_through_ties_once(self):
+        # every product has the same rating, so only the id tie-breaker orders them
+        seen, params = [], {"ordering": "-rating_avg", "page_size": 2, "fields": "id"}
+        url = reverse("products-list")
+        with CaptureQueriesContext(connection) as queries:
+            while url:
+                response = self.client.get(url, params)
+                seen += [row["id"] for row in response.data["results"]]
+                url, params = response.data["next"], None
+
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+        self.assertTrue(queries[0]["sql"].endswith('"products_product"."id" DESC LIMIT 3'))
+
+    def test_min_rating_must_be_a_rating(self):
+        for value in ("abc", "9", "-1"):
+            for name in ("products-list", "products-search"):
+                with self.subTest(name, value=value):
+                    response = self.client.get(reverse(name), {"min_rating": value})
+
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn("min_rating", response.data)
+
+        response = self.client.get(reverse("products-list"), {"min_rating": "4"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 5)
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from common.testing import make_category
+
+
+class CategoryListCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        for name in ("Audio", "Books", "Cameras"):
+            make_category(name)
+
+    def test_cached_pages_link_back_to_the_requesting_host(self):
+        url = reverse("category-list")
+        for host in ("localhost", "127.0.0.1"):
+            with self.subTest(host):
+                response = self.client.get(url, {"page_size": 2}, HTTP_HOST=host)
+
+                self.assertEqual([row["name"] for row in response.data["results"]], ["Audio", "Books"])
+                self.assertTrue(response.data["next"].startswith(f"http://{host}{url}?"))
+                self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"], HTTP_HOST="127.0.0.1")
+
+        self.assertEqual([row["name"] for row in response.data["results"]], ["Cameras"])
+        self.assertTrue(response.data["previous"].startswith("http://127.0.0.1"))
@@ -0,0 +1,57 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from common.testing import make_merchant, make_product, make_user
+
+
+class MerchantProductPermissionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = make_product(make_merchant())
+
+    def test_users_without_a_merchant_account_are_forbidden(self):
+        self.client.force_authenticate(make_user())
+        requests = [
+            ("get", reverse("merchant-products-list"), None),
+            ("get", reverse("merchant-products-export"), None),
+            ("post", reverse("merchant-products-import-products"), {}),
+            ("patch", reverse("merchant-products-bulk-update"), []),
+        ]
+        for method, url, data in requests:
+            with self.subTest(url=url):
+                response = getattr(self.client, method)(url, data, format="json")
+
+                self.assertEqual(response.status_code, 403)
+
+
+class MerchantProductOwnershipTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = make_product(make_merchant())
+        self.other = make_merchant()
+
+    def _sub_view_requests(self):
+        pk = self.product.pk
+        return [
+            ("patch", reverse("product-inventory", args=[pk]), {}),
+            ("post", reverse("add-product-specifications", args=[pk]), {}),
+            ("post", reverse("add-product-features", args=[pk]), {}),
+            ("get", reverse("product-images", args=[pk]), None),
+            ("post", reverse("set-primary", args=[pk, 1]), None),
+        ]
+
+    def test_anonymous_requests_are_rejected(self):
+        for method, url, data in self._sub_view_requests():
+            with self.subTest(url=url):
+                response = getattr(self.client, method)(url, data, format="json")
+
+                self.assertIn(response.status_code, (401, 403))
+
+    def test_another_merchants_product_is_not_found(self):
+        self.client.force_authenticate(self.other.user)
+        for method, url, data in self._sub_view_requests():
+            with self.subTest(url=url):
+                response = getattr(self.client, method)(url, data, format="json")
+
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.products.search import InvertedIndex
+from common.testing import make_category, make_merchant, make_product
+
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.merchant = make_merchant()
+        self.category = make_category()
+        self.product = make_product(self.merchant, self.category)
+        make_product(make_merchant())
+
+    def search(self, **params):
+        return self.client.get(reverse("products-search"), params)
+
+    def test_filters_by_category_and_merchant(self):
+        response = self.search(category=str(self.category.pk), merchant=str(self.merchant.pk))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.data["results"]], [str(self.product.pk)])
+
+    def test_malformed_ids_are_rejected(self):
+        for name in ("category", "merchant"):
+            with self.subTest(name):
+                response = self.search(**{name: "zzz"})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(name, response.data)
+
+
+class InvertedIndexTests(APITestCase):
+    def test_limit_keeps_the_best_ranked_matches(self):
+        merchant = make_merchant()
+        exact = make_product(merchant, name="Phone")
+        make_product(merchant, name="Phones")
+        make_product(merchant, name="Phone stand", description="A stand for any phone")
+        index = InvertedIndex()
+
+        self.assertEqual(len(index.search("phon")), 3)
+        self.assertEqual(index.search("phone", limit=1), {exact.pk})
@@ -0,0 +1,38 @@
+"""
+What the caller has done with the products on a page: the wishlist heart
+and the "in cart" badge.
+
+Listings add ``is_wishlisted`` and ``in_cart_quantity`` to every product
+when asked with ``?viewer=1``. The state for a whole page comes from one
+wishlist lookup (signed-in users only) and one cart lookup (signed-in or
+cookie cart), instead of one request per card.
+"""
+import uuid
+
+from apps.carts.services import quantities_in_cart
+from . import wishlist
+
+VIEWER_PARAM = "viewer"
+
+
+def wants_viewer_state(request):
+    return request.query_params.get(VIEWER_PARAM, "").lower() in ("1", "true", "yes")
+
+
+def add_viewer_state(request, items):
+    """Adds the caller's state to serialized products, in place. Returns ``items``."""
+    if any("id" not in item for item in items):
+        # a sparse response without ids has nothing to match the state on
+        return items
+
+    product_ids = [uuid.UUID(str(item["id"])) for item in items]
+
+    wishlisted = set()
+    if request.user.is_authenticated:
+        wishlisted = wishlist.wishlisted_ids(request.user, product_ids)
+    in_cart = quantities_in_cart(request, product_ids)
+
+    for item, product_id in zip(items, product_ids):
+        item["is_wishlisted"] = product_id in wishlisted
+        item["in_cart_quantity"] = in_cart.get(product_id, 0)
+    return items
@@ -0,0 +1,115 @@
+"""
+Wishlist writes and lookups.
+
+Adding and removing are idempotent. The row change and the
+``Product.likes_count`` change commit together, so the counter moves only
+when a row was actually inserted or deleted. Racing requests cannot count
+twice or raise on the unique (product, user) constraint.
+
+Each user's wishlist size is cached for the sidebar. Writes drop it after
+commit and the next read recounts.
+"""
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from integrations import redis as cache_tier
+from .models import Product, Wishlist
+
+# cap for one "which of these are wishlisted" lookup
+LOOKUP_LIMIT = 100
+COUNT_TIMEOUT = 60 * 60 * 6
+
+
+def _count_keys(user_ids):
+    # resolves the namespace version once for the whole batch
+    prefix = cache_tier.make_key(cache_tier.WISHLISTS, "count")
+    return [f"{prefix}:{user_id}" for user_id in user_ids]
+
+
+def count(user_id):
+    """How many products ``user_id`` has wishlisted, from the cache when possible."""
+    key = _count_keys([user_id])[0]
+    value = cache.get(key)
+    if value is None:
+        value = Wishlist.objects.filter(user_id=user_id).count()
+        cache.add(key, value, COUNT_TIMEOUT)
+    return value
+
+
+def forget(user_ids):
+    """Drops the cached counts of ``user_ids`` once the current transaction commits."""
+    keys = _count_keys(set(user_ids))
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _bump(product_id, delta):
+    products = Product.objects.filter(pk=product_id)
+    if delta < 0:
+        products = products.filter(likes_count__gt=0)
+    return products.update(likes_count=F("likes_count") + delta)
+
+
+def _likes_count(product_id):
+    return Product.objects.filter(pk=product_id).values_list("likes_count", flat=True).first() or 0
+
+
+@transaction.atomic
+def add(user, product_id):
+    """
+    Wishlists ``product_id`` for ``user``. Returns ``(added, likes_count)``;
+    ``added`` is False when it already was. Raises ``Product.DoesNotExist``.
+    """
+    try:
+        with transaction.atomic():
+            Wishlist.objects.create(user=user, product_id=product_id)
+    except IntegrityError:
+        # already wishlisted, possibly by a racing request
+        if not Product.objects.filter(pk=product_id).exists():
+            raise Product.DoesNotExist
+        return False, _likes_count(product_id)
+
+    # the foreign key may only be checked at commit, the update finds out now
+    if not _bump(product_id, +1):
+        raise Product.DoesNotExist
+    forget([user.pk])
+    return True, _likes_count(product_id)
+
+
+@transaction.atomic
+def remove(user, product_id):
+    """Un-wishlists ``product_id`` for ``user``. Returns ``(removed, likes_count)``."""
+    deleted, _ = Wishlist.objects.filter(user=user, product_id=product_id).delete()
+    if deleted:
+        _bump(product_id, -1)
+        forget([user.pk])
+    return bool(deleted), _likes_count(product_id)
+
+
+def toggle(user, product_id):
+    """Removes the product if wishlisted, adds it otherwise. Returns ``(wishlisted, likes_count)``."""
+    removed, likes_count = remove(user, product_id)
+    if removed:
+        return False, likes_count
+    return add(user, product_id)
+
+
+def items(user):
+    """The user's wishlist rows, newest first, with each product's card columns joined in."""
+    return (
+        Wishlist.objects.filter(user=user)
+        .select_related("product__primary_image")
+        .defer("product__search_vector")
+        .order_by("-created_at", "-id")
+    )
+
+
+def wishlisted_ids(user, product_ids):
+    """The subset of ``product_ids`` that ``user`` has wishlisted, in one query."""
+    if not product_ids:
+        return set()
+    return set(
+        Wishlist.objects.filter(user=user, product_id__in=product_ids)
+        .values_list("product_id", flat=True)
+    )
@@ -1,5 +1,6 @@
 from .shop.serializers.profile_serializers import UserSerializer, ProfileSerializer
 from .shop.serializers.merchants_serializers import (
     MerchantReviewSerializer,
-    MerchantSerializer
+    MerchantSerializer,
+    MerchantHeaderSerializer,
 )
\ No newline at end of file
@@ -1,6 +1,6 @@
 from django.urls import path
-from ....users.api.merchants.views.views import MerchantDashboardView
+from .views.dashboard_views import MerchantDashboardView
 
 urlpatterns = [
-    path("", MerchantDashboardView.as_view(), name="dashbboard"),
+    path("", MerchantDashboardView.as_view(), name="dashboard"),
 ]
@@ -11,7 +11,6 @@ from products.models import(
     ProductInventory, 
     Feature
 )
-from django.db.models import Avg
 
 
 class WishlistSerializer(ModelSerializer):
@@ -78,7 +77,6 @@ class ProductSerializer(ModelSerializer):
         
 
     def get_average_rating(self, obj):
-        avg = obj.product_reviews.aggregate(avg=Avg('rating'))['avg']
-        return round(avg, 1) if avg is not None else 0.0
+        return round(obj.rating_avg, 1)
 
 
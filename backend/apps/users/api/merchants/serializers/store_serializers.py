@@ -1,7 +1,6 @@
 from products.models import Product, ProductImage, Category, Review, ProductSpecification, Feature
 from users.models import Merchant, MerchantReview
 from rest_framework import serializers
-from django.db.models import Avg
 
 class MerchantReviewSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(source='user.profile.avatar', read_only=True)
@@ -26,7 +25,7 @@ class MerchantStoreSerializer(serializers.ModelSerializer):
     class Meta:
         model = Merchant
         fields = [
-            "id", "store_name", "average_rating", "merchant_reviews", "store_description", "store_address",
+            "id", "store_name", "average_rating", "rating_count", "merchant_reviews", "store_description", "store_address",
             "store_logo", "store_phone", "active_status", "verification_status",
              "total_sales", "created_at"
         ]
@@ -37,5 +36,4 @@ class MerchantStoreSerializer(serializers.ModelSerializer):
         return None
     
     def get_average_rating(self, obj):
-        avg = obj.merchant_reviews.aggregate(avg=Avg('rating'))['avg']
-        return round(avg, 1) if avg is not None else 0.0
+        return round(obj.rating_avg, 1)
@@ -1,20 +1,50 @@
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
 from rest_framework.views import APIView
-from products.models import Product
+from apps.products.models import Product
 from rest_framework.response import Response
 from rest_framework import serializers
 from rest_framework.permissions import IsAuthenticated
-from ..config.permissions import IsMerchantUser
+from apps.orders.sales import PERIODS, sales_series, top_products
+from common.permissions import IsMerchantUser
+
+# how far back each period looks by default
+DEFAULT_RANGE_DAYS = {"day": 30, "week": 7 * 12, "month": 365}
+MAX_RANGE_DAYS = 366 * 2
+
 
 class MerchantDashboardView(APIView):
     permission_classes = [IsAuthenticated, IsMerchantUser]
 
     def get(self, request):
         merchant = request.user.merchant
-        products = Product.objects.filter(merchant=merchant)
 
-        total_products = products.count()
-        active_products = products.filter(is_active=True).count()
-        inactive_products = products.filter(is_active=False).count()
+        period = request.query_params.get("period", "day")
+        if period not in PERIODS:
+            raise serializers.ValidationError({"period": f"Must be one of {', '.join(PERIODS)}"})
+        try:
+            days = int(request.query_params.get("days", DEFAULT_RANGE_DAYS[period]))
+        except ValueError:
+            raise serializers.ValidationError({"days": "Must be a number"})
+        days = max(1, min(days, MAX_RANGE_DAYS))
+        since = timezone.localdate() - timedelta(days=days - 1)
+
+        # one query for all three product counts
+        stats = Product.objects.filter(merchant=merchant).aggregate(
+            total_products=Count("id"),
+            active_products=Count("id", filter=Q(is_active=True)),
+            inactive_products=Count("id", filter=Q(is_active=False)),
+        )
+
+        # sales come from the daily rollups, not the order history
+        series = sales_series(merchant, since, period)
+        totals = {
+            "revenue": sum(row["revenue"] for row in series),
+            "orders_count": sum(row["orders_count"] for row in series),
+            "units_sold": sum(row["units_sold"] for row in series),
+        }
 
         data = {
             "merchant": {
@@ -23,11 +53,14 @@ class MerchantDashboardView(APIView):
                 "active_status": merchant.active_status,
                 "total_sales": merchant.total_sales,
             },
-            "stats": {
-                "total_products": total_products,
-                "active_products": active_products,
-                "inactive_products": inactive_products,
-            }
+            "stats": stats,
+            "sales": {
+                "period": period,
+                "since": since,
+                "totals": totals,
+                "series": series,
+                "top_products": top_products(merchant, since),
+            },
         }
 
-        return Response(data)
\ No newline at end of file
+        return Response(data)
@@ -1,8 +1,8 @@
 from apps.users.models import Merchant, MerchantReview
 
 from rest_framework import serializers
-from django.db.models import Avg
-from apps.products.api import ProductSerializer
+from apps.products.api import ProductCardSerializer
+from common.fieldsets import SparseFieldsMixin
 
 class MerchantReviewSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(source='user.profile.avatar', read_only=True)
@@ -19,7 +19,29 @@ class MerchantReviewSerializer(serializers.ModelSerializer):
         return obj.user.email or "Anonymous"
 
 
-class MerchantSerializer(serializers.ModelSerializer):
+class MerchantHeaderSerializer(serializers.ModelSerializer):
+    """The store header of the storefront page: merchant columns only."""
+    store_logo = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Merchant
+        fields = [
+            "id", "store_name", "average_rating", "rating_count", "store_description", "store_address",
+            "store_logo", "store_phone", "active_status", "verification_status",
+            "total_sales", "created_at"
+        ]
+
+    def get_store_logo(self, obj):
+        if obj.store_logo:
+            return obj.store_logo.url
+        return None
+
+    def get_average_rating(self, obj):
+        return round(obj.rating_avg, 1)
+
+
+class MerchantSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     store_logo = serializers.SerializerMethodField()
     products = serializers.SerializerMethodField()
     merchant_reviews = MerchantReviewSerializer(many=True, read_only=True)
@@ -29,10 +51,12 @@ class MerchantSerializer(serializers.ModelSerializer):
     class Meta:
         model = Merchant
         fields = [
-            "id", "store_name", "average_rating", "products", "merchant_reviews", "store_description", "store_address",
+            "id", "store_name", "average_rating", "rating_count", "products", "merchant_reviews", "store_description", "store_address",
             "store_logo", "store_phone", "active_status", "verification_status",
              "total_sales", "created_at"
         ]
+        # loaded only when listed in ?fields= or ?expand= (see MerchantViewSet)
+        expandable_fields = ["products", "merchant_reviews"]
 
     def get_store_logo(self, obj):
         if obj.store_logo:
@@ -41,8 +65,7 @@ class MerchantSerializer(serializers.ModelSerializer):
 
     def get_products(self, obj):
         products = obj.products.all()
-        return ProductSerializer(products, many=True, context=self.context).data
+        return ProductCardSerializer(products, many=True, context=self.context).data
     
     def get_average_rating(self, obj):
-        avg = obj.merchant_reviews.aggregate(avg=Avg('rating'))['avg']
-        return round(avg, 1) if avg is not None else 0.0
+        return round(obj.rating_avg, 1)
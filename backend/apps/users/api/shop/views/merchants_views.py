@@ -3,21 +3,99 @@ from apps.users.models import Merchant
 from rest_framework import viewsets, generics
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAuthenticatedOrReadOnly
 
-from apps.users.api import MerchantSerializer, MerchantReviewSerializer
+from apps.users.api import MerchantSerializer, MerchantReviewSerializer, MerchantHeaderSerializer
+from apps.products.api import ProductCardSerializer
+from apps.products.models import Product
+from apps.products.viewer import add_viewer_state, wants_viewer_state
+from common.authentication import OptionalJWTAuthentication
 # user_manager/views.py
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from apps.users.models import Merchant, MerchantReview
 from django.db import models
-from django.db.models import Avg
+from django.db.models import Prefetch
+from rest_framework.filters import OrderingFilter
+from rest_framework.decorators import action
+from common.pagination import (
+    MerchantCursorPagination,
+    StorefrontProductPagination,
+    StorefrontReviewPagination,
+)
 
 # class MerchantViewSet(viewsets.ModelViewSet):
 class MerchantViewSet(viewsets.ModelViewSet):
     queryset = Merchant.objects.all()
     serializer_class = MerchantSerializer
-    authentication_classes = []
+    authentication_classes = [OptionalJWTAuthentication]
     permission_classes = []
+    pagination_class = MerchantCursorPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['created_at', 'rating_avg', 'rating_count']
+    ordering = ('-created_at', '-id')
+
+    # how each relation MerchantSerializer renders is loaded
+    RELATIONS = {
+        "products": Prefetch("products", queryset=Product.objects.for_cards()),
+        "merchant_reviews": Prefetch(
+            "merchant_reviews", queryset=MerchantReview.objects.select_related("user__profile")
+        ),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ['list', 'retrieve']:
+            return queryset
+
+        # ?fields= / ?expand= also decide what gets prefetched
+        relations = MerchantSerializer.selected_relations(self.request)
+        if relations is None:
+            relations = self.RELATIONS
+        return queryset.prefetch_related(*[self.RELATIONS[name] for name in relations])
+
+    # GET /api/merchants/<id>/storefront/?products_cursor=&reviews_cursor=&viewer=
+    @action(detail=True, methods=['get'])
+    def storefront(self, request, pk=None):
+        """
+        Store page: the merchant header, one page of product cards and one
+        page of reviews, each paged by its own cursor. Three queries in
+        total whatever the page sizes: merchant, products with their
+        primary image, reviews with their authors.
+        """
+        merchant = self.get_object()
+
+        products = StorefrontProductPagination()
+        product_page = products.paginate_queryset(
+            Product.objects.for_cards().filter(merchant=merchant, is_active=True),
+            request,
+            view=self,
+        )
+
+        product_cards = ProductCardSerializer(product_page, many=True).data
+        if wants_viewer_state(request):
+            add_viewer_state(request, product_cards)
+
+        # no view: ?ordering= names merchant and product fields, the
+        # reviews always page newest first
+        reviews = StorefrontReviewPagination()
+        review_page = reviews.paginate_queryset(
+            MerchantReview.objects.filter(merchant=merchant).select_related("user__profile"),
+            request,
+        )
+
+        return Response({
+            "merchant": MerchantHeaderSerializer(merchant, context=self.get_serializer_context()).data,
+            "products": {
+                "next": products.get_next_link(),
+                "previous": products.get_previous_link(),
+                "results": product_cards,
+            },
+            "reviews": {
+                "next": reviews.get_next_link(),
+                "previous": reviews.get_previous_link(),
+                "results": MerchantReviewSerializer(review_page, many=True).data,
+            },
+        })
 
 
 class MerchantReviewCreateView(generics.CreateAPIView):
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='merchant',
+            index=models.Index(fields=['-created_at', '-id'], name='merchant_pr_created_13a204_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-18 08:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_merchant_rating_1_count_merchant_rating_2_count_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='merchantreview',
+            index=models.Index(fields=['merchant', '-created_at', '-id'], name='merchant_re_merchan_9c4be8_idx'),
+        ),
+    ]
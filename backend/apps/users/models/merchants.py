@@ -4,8 +4,9 @@ from django.db import models
 import uuid
 from cloudinary.models import CloudinaryField
 from .users import User
+from common.ratings import RatingAggregate
 
-class Merchant(models.Model):
+class Merchant(RatingAggregate):
 
     STATUS_CHOICES = [
         ("active", "Active"),
@@ -38,6 +39,7 @@ class Merchant(models.Model):
     active_status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="inactive"
     )
+    # units sold in counted sub-orders, kept by apps/orders/sales.py
     total_sales = models.PositiveIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
@@ -45,6 +47,10 @@ class Merchant(models.Model):
 
     class Meta:
         db_table = "merchant_profiles"
+        indexes = [
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['-rating_avg']),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.store_name}"
@@ -61,3 +67,13 @@ class MerchantReview(models.Model):
 
     class Meta:
         db_table = "merchant_reviews"
+        indexes = [
+            models.Index(fields=['merchant', '-created_at', '-id']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so merchant rating aggregates can apply the change as a delta
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
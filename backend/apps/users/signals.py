@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.users.models import Merchant, MerchantReview
+from common.ratings import rating_delta, rebuild_ratings
+from integrations import redis as cache_tier
+
+
+# product payloads embed a merchant summary
+cache_tier.invalidate_on_change(Merchant, cache_tier.MERCHANTS, cache_tier.PRODUCTS)
+
+
+@receiver(post_save, sender=MerchantReview)
+def merchant_review_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_rating', None)
+
+    if not created and previous is None:
+        # we don't know what the old rating was, recount this merchant
+        with transaction.atomic():
+            rebuild_ratings(Merchant, MerchantReview.objects.all(), 'merchant', ids=[instance.merchant_id])
+    elif created or previous != instance.rating:
+        Merchant.objects.filter(pk=instance.merchant_id).update(
+            **rating_delta(added=instance.rating, removed=previous)
+        )
+
+    instance._loaded_rating = instance.rating
+
+
+@receiver(post_delete, sender=MerchantReview)
+def merchant_review_deleted(sender, instance, **kwargs):
+    removed = getattr(instance, '_loaded_rating', instance.rating)
+    Merchant.objects.filter(pk=instance.merchant_id).update(**rating_delta(removed=removed))
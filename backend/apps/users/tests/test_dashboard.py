@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.orders.services import load_checkout_lines, mark_order_paid, place_order
+from common.testing import SHIPPING, make_cart, make_merchant, make_product, make_user
+
+
+class MerchantDashboardViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.merchant = make_merchant()
+
+    def test_reports_product_counts_and_sales(self):
+        product = make_product(self.merchant)
+        make_product(self.merchant, is_active=False)
+        buyer = make_user()
+        mark_order_paid(place_order(buyer, load_checkout_lines(make_cart(buyer, {product: 3})), SHIPPING))
+        self.client.force_authenticate(self.merchant.user)
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("dashboard"), {"period": "week"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["stats"], {"total_products": 2, "active_products": 1, "inactive_products": 1})
+        self.assertEqual(response.data["sales"]["totals"]["units_sold"], 3)
+        self.assertEqual(response.data["sales"]["totals"]["orders_count"], 1)
+
+    def test_rejects_users_without_a_merchant_account(self):
+        self.client.force_authenticate(make_user())
+
+        self.assertEqual(self.client.get(reverse("dashboard")).status_code, 403)
+
+    def test_rejects_an_unknown_period(self):
+        self.client.force_authenticate(self.merchant.user)
+
+        self.assertEqual(self.client.get(reverse("dashboard"), {"period": "year"}).status_code, 400)
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.users.models import MerchantReview
+from common.testing import make_merchant, make_product, make_user
+
+
+class StorefrontTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.merchant = make_merchant()
+        for _ in range(6):
+            make_product(self.merchant)
+        for _ in range(6):
+            MerchantReview.objects.create(merchant=self.merchant, user=make_user(), rating=4, comment="Good")
+        self.url = reverse("merchants-storefront", args=[self.merchant.pk])
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        for page_size in (1, 6):
+            with self.subTest(page_size=page_size):
+                # merchant, products with their image, reviews with their authors
+                with self.assertNumQueries(3):
+                    response = self.client.get(
+                        self.url, {"products_page_size": page_size, "reviews_page_size": page_size}
+                    )
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.data["products"]["results"]), page_size)
+                self.assertEqual(len(response.data["reviews"]["results"]), page_size)
+
+    def test_product_ordering_is_not_applied_to_reviews(self):
+        response = self.client.get(self.url, {"ordering": "-rating_avg"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["reviews"]["results"]), 6)
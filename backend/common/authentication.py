@@ -0,0 +1,16 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+
+class OptionalJWTAuthentication(JWTAuthentication):
+    """
+    For public endpoints that personalise their response when they can.
+    A valid token signs the user in; a missing, expired or invalid one
+    leaves the request anonymous instead of failing it with a 401.
+    """
+
+    def authenticate(self, request):
+        try:
+            return super().authenticate(request)
+        except (InvalidToken, TokenError):
+            return None
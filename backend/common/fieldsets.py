@@ -0,0 +1,47 @@
+"""
+Sparse fieldsets for API responses.
+
+``?fields=id,name`` limits a response to the listed top-level fields.
+``?expand=images,merchant`` adds nested relations. A serializer names its
+heavy relations in ``Meta.expandable_fields``. Once either parameter is
+given, those relations are left out unless they are listed. Without either
+parameter the serializer renders in full, as before.
+
+Views ask ``selected_relations`` which relations will be rendered and
+prefetch only those, so leaving a relation out also saves its query.
+"""
+
+
+def _split(value):
+    return {name.strip() for name in (value or "").split(",") if name.strip()}
+
+
+class SparseFieldsMixin:
+    """Drops the fields the request did not ask for. Use on top-level serializers."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get("request"))
+        if selected is not None:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        """The field names to render, or ``None`` for all of them."""
+        params = getattr(request, "query_params", None)
+        if not params or ("fields" not in params and "expand" not in params):
+            return None
+
+        declared = set(cls.Meta.fields)
+        expandable = set(getattr(cls.Meta, "expandable_fields", ()))
+        fields = _split(params.get("fields")) or declared - expandable
+        return (fields | _split(params.get("expand"))) & declared
+
+    @classmethod
+    def selected_relations(cls, request):
+        """The expandable relations that will be rendered, or ``None`` for all."""
+        selected = cls.selected_fields(request)
+        if selected is None:
+            return None
+        return selected & set(getattr(cls.Meta, "expandable_fields", ()))
@@ -0,0 +1,67 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the ``-created_at`` ordering our models declare.
+    The cursor encodes the last ``created_at`` seen, so every page is an
+    indexed ``WHERE created_at < ...`` range scan rather than an OFFSET,
+    and deep pages cost the same as the first one. ``id`` breaks ties so
+    rows sharing a timestamp keep a stable order between requests.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        # ?ordering=-rating_avg and the like sort on a column full of ties;
+        # id keeps the order total so the cursor cannot skip or repeat rows
+        ordering = tuple(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            ordering += ("-id" if ordering[0].startswith("-") else "id",)
+        return ordering
+
+
+class ProductCursorPagination(CreatedAtCursorPagination):
+    page_size = 24
+
+
+class MerchantCursorPagination(CreatedAtCursorPagination):
+    page_size = 20
+
+
+class StorefrontProductPagination(ProductCursorPagination):
+    # the storefront pages products and reviews side by side,
+    # so each needs its own cursor parameter
+    cursor_query_param = "products_cursor"
+    page_size_query_param = "products_page_size"
+
+
+class StorefrontReviewPagination(CreatedAtCursorPagination):
+    page_size = 10
+    max_page_size = 50
+    cursor_query_param = "reviews_cursor"
+    page_size_query_param = "reviews_page_size"
+
+
+class WishlistCursorPagination(CreatedAtCursorPagination):
+    page_size = 24
+
+
+class OrderCursorPagination(CreatedAtCursorPagination):
+    page_size = 10
+    max_page_size = 50
+
+
+class NotificationCursorPagination(CreatedAtCursorPagination):
+    page_size = 20
+    max_page_size = 50
+
+
+class CategoryCursorPagination(CursorPagination):
+    # category names are unique, so they make a stable cursor on their own
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = "name"
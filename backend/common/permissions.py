@@ -0,0 +1,10 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsMerchantUser(BasePermission):
+    """Signed-in users with a merchant account."""
+    message = "You are not a merchant."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and hasattr(user, "merchant"))
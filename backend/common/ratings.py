@@ -0,0 +1,112 @@
+from django.db import models
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+
+
+STARS = range(1, 6)
+
+
+class RatingAggregate(models.Model):
+    """
+    Denormalized review statistics kept on the reviewed object, so listings
+    can sort and filter by rating without aggregating the review table.
+    """
+    rating_avg = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    # per-star histogram
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f"rating_{star}_count") for star in STARS}
+
+
+def rating_delta(added=None, removed=None):
+    """
+    Returns ``update()`` kwargs that apply one review being added, removed
+    or changed (``added`` and ``removed`` both set) in a single UPDATE.
+    The average is derived from the pre-update columns plus the delta, so
+    concurrent reviews never read a stale count.
+    """
+    count_delta = (added is not None) - (removed is not None)
+    sum_delta = (added or 0) - (removed or 0)
+
+    new_count = F("rating_count") + count_delta
+    new_sum = F("rating_sum") + sum_delta
+    values = {
+        "rating_count": new_count,
+        "rating_sum": new_sum,
+        "rating_avg": Case(
+            When(Q(rating_count__lte=-count_delta), then=Value(0.0)),
+            default=Cast(new_sum, FloatField()) / Cast(new_count, FloatField()),
+            output_field=FloatField(),
+        ),
+    }
+
+    buckets = {}
+    for rating, step in ((added, 1), (removed, -1)):
+        if rating in STARS:
+            buckets[rating] = buckets.get(rating, 0) + step
+    for star, step in buckets.items():
+        if step:
+            field = f"rating_{star}_count"
+            values[field] = F(field) + step
+
+    return values
+
+
+def rating_totals(reviews, group_by):
+    """
+    Aggregates a review queryset into per-object rating columns, keyed by
+    the ``group_by`` foreign key value. Used to rebuild the stored values.
+    """
+    rows = reviews.values(group_by).annotate(
+        rating_count=Count("id"),
+        rating_sum=Sum("rating"),
+        **{
+            f"rating_{star}_count": Count("id", filter=Q(rating=star))
+            for star in STARS
+        },
+    )
+    totals = {}
+    for row in rows:
+        key = row.pop(group_by)
+        row["rating_avg"] = row["rating_sum"] / row["rating_count"]
+        totals[key] = row
+    return totals
+
+
+RATING_FIELDS = [
+    "rating_avg", "rating_count", "rating_sum",
+    *(f"rating_{star}_count" for star in STARS),
+]
+
+
+def rebuild_ratings(model, reviews, group_by, ids=None, batch_size=500):
+    """
+    Recomputes the stored rating columns of ``model`` from ``reviews``.
+    Every targeted row is reset to zero, then the reviewed ones are written
+    back with ``bulk_update`` in batches. Pass ``ids`` to limit the rebuild;
+    call it inside a transaction so readers never see the zeroed state.
+    """
+    objects = model.objects.all()
+    if ids is not None:
+        objects = objects.filter(pk__in=ids)
+        reviews = reviews.filter(**{f"{group_by}__in": ids})
+
+    objects.update(**{field: 0 for field in RATING_FIELDS})
+
+    totals = rating_totals(reviews, group_by)
+    batch = [model(pk=pk, **values) for pk, values in totals.items()]
+    model.objects.bulk_update(batch, RATING_FIELDS, batch_size=batch_size)
+
+    return len(totals)
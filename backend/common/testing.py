@@ -0,0 +1,51 @@
+"""
+Small fixture builders shared by the app test suites.
+"""
+import itertools
+from decimal import Decimal
+
+from apps.carts.models import Cart, CartItem
+from apps.products.models import Category, Product
+from apps.users.models import Merchant, User
+
+_sequence = itertools.count()
+
+SHIPPING = {
+    "full_address": "1 Test Street",
+    "city": "Lagos",
+    "state": "Lagos",
+    "zip_code": "100001",
+    "country": "NG",
+    "phone": "0800000000",
+}
+
+
+def make_user(**extra):
+    return User.objects.create_user(email=f"user{next(_sequence)}@example.com", password="pass", **extra)
+
+
+def make_merchant(**extra):
+    return Merchant.objects.create(user=make_user(), store_name=f"Store {next(_sequence)}", **extra)
+
+
+def make_category(name=None):
+    return Category.objects.create(name=name or f"Category {next(_sequence)}")
+
+
+def make_product(merchant, category=None, **extra):
+    fields = {
+        "name": f"Product {next(_sequence)}",
+        "description": "A product",
+        "stock": 10,
+        "original_price": Decimal("10.00"),
+        **extra,
+    }
+    return Product.objects.create(merchant=merchant, category=category or make_category(), **fields)
+
+
+def make_cart(user, quantities):
+    """A saved cart for ``user`` holding ``{product: quantity}``."""
+    cart = Cart.objects.create(user=user)
+    for product, quantity in quantities.items():
+        CartItem.objects.create(cart=cart, product=product, quantity=quantity)
+    return cart
@@ -0,0 +1,152 @@
+"""
+Per-user event fan-out for push connections.
+
+Every process keeps a hub of local subscribers: one bounded asyncio queue
+per open connection, keyed by user id. Publishing goes through a broker.
+The broker decides which processes see the event:
+
+- ``LocalBroker`` hands it straight to this process's hub. That is enough
+  for a single ASGI process and for dev.
+- ``RedisBroker`` publishes to one Redis channel. Every process listens on
+  that channel from a background thread and dispatches to its own
+  subscribers, so an event raised in a WSGI worker or a management
+  command reaches a stream held open by any ASGI process.
+
+The broker is chosen by ``settings.REALTIME_BROKER`` ("local" or "redis"),
+defaulting to Redis whenever ``REDIS_URL`` is configured.
+``publish`` is safe to call from sync code in any thread.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "realtime:events"
+# events a slow client may fall behind by before newer ones are dropped
+QUEUE_SIZE = 100
+
+
+class Hub:
+    """Local subscribers of this process, by user id."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def add(self, user_id, queue, loop):
+        with self._lock:
+            self._subscribers[str(user_id)].add((queue, loop))
+
+    def remove(self, user_id, queue, loop):
+        with self._lock:
+            subscribers = self._subscribers.get(str(user_id))
+            if subscribers is None:
+                return
+            subscribers.discard((queue, loop))
+            if not subscribers:
+                del self._subscribers[str(user_id)]
+
+    def dispatch(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(str(user_id), ()))
+        for queue, loop in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def _offer(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        logger.warning("Realtime subscriber queue full, dropping %s event", event.get("type"))
+
+
+class LocalBroker:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, user_id, event):
+        self.hub.dispatch(user_id, event)
+
+    def start(self):
+        pass
+
+
+class RedisBroker:
+    def __init__(self, hub, url):
+        import redis
+
+        self.hub = hub
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def publish(self, user_id, event):
+        payload = json.dumps({"user": str(user_id), "event": event}, cls=DjangoJSONEncoder)
+        self.client.publish(CHANNEL, payload)
+
+    def start(self):
+        # only processes that hold streams need to listen
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="realtime-listener", daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    data = json.loads(message["data"])
+                    self.hub.dispatch(data["user"], data["event"])
+            except Exception:
+                logger.exception("Realtime listener lost its Redis connection, reconnecting")
+                time.sleep(1)
+
+
+hub = Hub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            url = getattr(settings, "REDIS_URL", None)
+            kind = getattr(settings, "REALTIME_BROKER", "redis" if url else "local")
+            _broker = RedisBroker(hub, url) if kind == "redis" else LocalBroker(hub)
+        return _broker
+
+
+def publish(user_id, event):
+    try:
+        get_broker().publish(user_id, event)
+    except Exception:
+        # push is best effort; the inbox API is the source of truth
+        logger.exception("Could not publish %s event", event.get("type"))
+
+
+@asynccontextmanager
+async def subscribe(user_id):
+    """Yields a queue that receives every event published for ``user_id``."""
+    get_broker().start()
+    queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+    loop = asyncio.get_running_loop()
+    hub.add(user_id, queue, loop)
+    try:
+        yield queue
+    finally:
+        hub.remove(user_id, queue, loop)
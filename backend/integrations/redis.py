@@ -0,0 +1,172 @@
+"""
+Shared cache tier.
+
+In production ``CACHES["default"]`` is Redis (see settings/prod.py), so a
+payload cached by one gunicorn worker is served, and invalidated, for all
+of them. Without ``REDIS_URL`` (dev, tests) Django's in-process
+LocMemCache stands in behind the same helpers.
+
+Keys are grouped into namespaces. Every namespace carries a version that
+is part of each key, so a whole namespace is invalidated in O(1) by
+bumping the version; stale entries simply age out.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+# namespaces
+PRODUCTS = "products"
+CATEGORIES = "categories"
+MERCHANTS = "merchants"
+NOTIFICATIONS = "notifications"
+WISHLISTS = "wishlists"
+
+DEFAULT_TIMEOUT = 60 * 15
+# how long one process may hold the recompute lock before others give up waiting
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+_MISSING = object()
+
+
+def _version_key(namespace):
+    return f"ns:{namespace}:version"
+
+
+def namespace_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # start from the clock so a lost version key never reuses old keys
+        cache.add(_version_key(namespace), int(time.time()), timeout=None)
+        version = cache.get(_version_key(namespace))
+    return version
+
+
+def make_key(namespace, *parts):
+    suffix = ":".join(str(part) for part in parts)
+    return f"{namespace}:v{namespace_version(namespace)}:{suffix}"
+
+
+def get(namespace, *parts, default=None):
+    return cache.get(make_key(namespace, *parts), default)
+
+
+def set(namespace, *parts, value, timeout=DEFAULT_TIMEOUT):
+    cache.set(make_key(namespace, *parts), value, timeout)
+
+
+def invalidate(namespace, *parts):
+    """
+    Drops one entry when ``parts`` are given, otherwise the whole namespace.
+    """
+    if parts:
+        cache.delete(make_key(namespace, *parts))
+        return
+
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), int(time.time()), timeout=None)
+
+
+class _KeyedLocks:
+    """Per-key thread locks that are dropped once nobody holds them."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+
+    @contextmanager
+    def hold(self, key):
+        with self._guard:
+            lock, users = self._locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._guard:
+                lock, users = self._locks[key]
+                if users == 1:
+                    del self._locks[key]
+                else:
+                    self._locks[key] = (lock, users - 1)
+
+
+_local_locks = _KeyedLocks()
+
+
+def get_or_set(namespace, *parts, compute, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns the cached value, computing it at most once on a miss.
+
+    Threads of this process queue on a local lock; other processes are held
+    off by an ``add()`` lock in the cache (``SET NX`` on Redis) and poll for
+    the result instead of stampeding the database. If the lock holder dies
+    the lock expires after ``LOCK_TIMEOUT`` and a waiter recomputes.
+    """
+    key = make_key(namespace, *parts)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    lock_key = f"{key}:lock"
+    with _local_locks.hold(key):
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            acquired = cache.add(lock_key, 1, LOCK_TIMEOUT)
+
+        if not acquired:
+            logger.warning("Cache lock for %s timed out, recomputing anyway", key)
+
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            if acquired:
+                cache.delete(lock_key)
+        return value
+
+
+def invalidate_on_change(model, *namespaces, keys=None):
+    """
+    Invalidates cached payloads whenever a ``model`` row is saved or deleted.
+
+    Without ``keys`` each namespace is bumped as a whole. With ``keys`` only
+    the entries it returns for the changed instance, as ``(namespace, *parts)``
+    tuples, are dropped. Invalidation runs after commit so a concurrent
+    reader cannot repopulate the cache with pre-commit rows.
+    """
+    def handler(sender, instance, **kwargs):
+        if keys is None:
+            targets = [(namespace,) for namespace in namespaces]
+        else:
+            targets = list(keys(instance))
+
+        def run():
+            for target in targets:
+                invalidate(*target)
+
+        transaction.on_commit(run)
+
+    uid = f"cache-invalidate:{model._meta.label}:{','.join(namespaces)}:{id(keys)}"
+    post_save.connect(handler, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+    return handler
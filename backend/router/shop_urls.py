@@ -9,6 +9,8 @@ from apps.users.api.shop.routes import merchants_urls
 from apps.users.api.shop.routes import profile_urls
 from apps.orders.api.shop import urls as order_urls
 from apps.carts.api.shop import urls as cart_urls
+from apps.notifications.api.shop import urls as notification_urls
+from utils.sidebar import urls as sidebar_urls
 
 urlpatterns = [
     path('auth/', include(auth_urls)),
@@ -18,5 +20,7 @@ urlpatterns = [
     path('products/', include(products_urls)),
     path('cart/', include(cart_urls)),
     path('orders/', include(order_urls)),
+    path('notifications/', include(notification_urls)),
+    path('sidebar/', include(sidebar_urls)),
 
 ]
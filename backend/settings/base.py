@@ -115,6 +115,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+
+    # keyset pagination: list endpoints never return unbounded result sets
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": 20,
     
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',  # For guests (not logged in)
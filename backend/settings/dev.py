@@ -10,6 +10,11 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # SQLite ignores select_for_update: take the write lock up front and
+        # wait for it, so concurrent checkouts queue instead of failing
+        "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+        # a file, so test threads with their own connections share it
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 
     # "default": dj_database_url.config(default=os.getenv("DB_URL"))
@@ -19,12 +19,25 @@ DATABASES = {
 }
 
 
-# Free-tier friendly cache
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+# Shared cache for all workers (integrations/redis.py). Without REDIS_URL
+# fall back to the free-tier friendly per-process cache.
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "ebuy",
+            "TIMEOUT": 60 * 15,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
     }
-}
 
 LOGGING = {
     "version": 1,
@@ -3,5 +3,5 @@ from .views import SidebarStatsView
 from django.urls import path
 
 urlpatterns = [
-    path('', SidebarStatsView.as_view(), name='wishlist'),
+    path('', SidebarStatsView.as_view(), name='sidebar-stats'),
 ]
\ No newline at end of file
@@ -1,23 +1,35 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from ..products.serializers import ProductSerializer
 
-from products.models import Wishlist, Product, Category
-from 
+from apps.products import wishlist
+from apps.products.models import Product, Category
+from integrations import redis as cache_tier
+
+
+def catalog_totals():
+    return {
+        "products": Product.objects.count(),
+        "categories": Category.objects.count(),
+    }
+
 
 class SidebarStatsView(APIView):
+    """
+    Sidebar badges. The catalog totals live in the CATEGORIES namespace,
+    which is bumped when a product is added, removed or moved or a category
+    changes (apps/products/signals.py). The wishlist size is cached per
+    user by apps/products/wishlist.py. A warm page view makes no queries.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        products = Product.objects.all().count()
-        wishlist = Wishlist.objects.filter(user=request.user).count()
-        category = Category.objects.all().count()
+        totals = cache_tier.get_or_set(cache_tier.CATEGORIES, 'sidebar-totals', compute=catalog_totals)
 
         data = {
-            "products": products,
-            "wishlist": wishlist,
-            "category": category
+            "products": totals["products"],
+            "wishlist": wishlist.count(request.user.pk),
+            "category": totals["categories"]
         }
 
-        return Response(data)
\ No newline at end of file
+        return Response(data)
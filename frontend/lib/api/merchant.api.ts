@@ -4,7 +4,7 @@ export const merchantApi = {
   getMerchants: async () => {
     try {
       const res = await apiService.get("/merchants/");
-      return res;
+      return res.results;
     } catch (error) {
       console.error("Error fetching merchant:", error);
       throw error;
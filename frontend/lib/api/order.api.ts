@@ -14,7 +14,7 @@ export const orderApi = {
     try {
       const res = await apiService.get("/orders/");
 
-      return res;
+      return res.results;
     } catch (error) {
       console.error("Error fetching cart:", error);
       throw error;
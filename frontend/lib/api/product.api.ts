@@ -4,7 +4,7 @@ export const productApi = {
   getProducts: async () => {
     try {
       const res = await apiService.get("/products/");
-      return res;
+      return res.results;
     } catch (error) {
       console.error("Error fetching products:", error);
       throw error;
@@ -34,7 +34,7 @@ export const productApi = {
   getProductsCategory: async () => {
     try {
       const res = await apiService.get("/categories/");
-      return res;
+      return res.results;
     } catch (error) {
       console.error("Error fetching products:", error);
       throw error;
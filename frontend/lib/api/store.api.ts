@@ -42,7 +42,7 @@ export const StoreApi = {
     try {
       const res = await apiService.get("/categories/");
       console.log("categories", res);
-      return res;
+      return res.results;
     } catch (error) {
       console.error("Error fetching products:", error);
       throw error;